@@ -0,0 +1,84 @@
+import time
+import hashlib
+from collections import OrderedDict
+
+
+def make_key(messages, **settings):
+    """Hash role-tagged messages plus model settings into a cache key.
+
+    Message text is normalized (case and whitespace) so trivially different
+    phrasings of the same question share an entry.
+    """
+    h = hashlib.sha256()
+    for name in sorted(settings):
+        h.update(f"{name}={settings[name]}\x1f".encode())
+    for m in messages:
+        text = " ".join((m["content"] or "").lower().split())
+        h.update(f"{m['role']}\x1e{text}\x1f".encode())
+    return h.hexdigest()
+
+
+class ResponseCache:
+    """LRU cache of AI completions with TTL and a byte budget.
+
+    Expired entries stay until evicted so they can still be served as a
+    stale fallback while the AI provider is down.
+    """
+
+    def __init__(self, max_entries=1024, max_bytes=2_000_000, ttl=3600):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.entries = OrderedDict()  # key -> (expires_at, value, size)
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.stale_hits = 0
+
+    def get(self, key, allow_stale=False):
+        entry = self.entries.get(key)
+        if entry is None:
+            if not allow_stale:
+                self.misses += 1
+            return None
+        expires_at, value, size = entry
+        if allow_stale:
+            self.stale_hits += 1
+            return value
+        if expires_at < time.monotonic():
+            self.misses += 1
+            return None
+        self.entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def set(self, key, value):
+        size = len(value.encode())
+        if size > self.max_bytes:
+            return
+        if key in self.entries:
+            self._remove(key)
+        self.entries[key] = (time.monotonic() + self.ttl, value, size)
+        self.bytes += size
+        # Evict least recently used until both limits hold
+        while len(self.entries) > self.max_entries or self.bytes > self.max_bytes:
+            self._remove(next(iter(self.entries)))
+
+    def clear(self):
+        self.entries.clear()
+        self.bytes = 0
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {
+            "entries": len(self.entries),
+            "bytes": self.bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "stale_hits": self.stale_hits,
+            "hit_rate": self.hits / total if total else 0.0,
+        }
+
+    def _remove(self, key):
+        _, _, size = self.entries.pop(key)
+        self.bytes -= size
@@ -1,137 +1,440 @@
 import os
 from dotenv import load_dotenv
-from together import Together
-import textwrap
+import together
+from together import AsyncTogether
 import asyncio
+import time
+import aiohttp
+from collections import Counter
+from contextlib import nullcontext
+from bot.ai.cache import ResponseCache, make_key
+from bot.ai.context import ConversationContext
+from bot.ai.summarizer import Summarizer
+from bot.ai.memory import VectorMemory
+from bot.ai.resilience import CircuitBreaker, CircuitOpenError, is_retryable, backoff
+from bot.ai.router import TIERS, FALLBACK_TIERS, route
+from bot.ai.prompt import SystemPrompt
+from bot.utils.replies import resolve_reference
+from bot.utils.routing import routes, ROUTE_AI
 
-# Conversation history
-conversation_history = {}
-MAX_HISTORY = 5  # Last 5 messages stored
+# Conversation history, kept per channel and packed into prompts by token budget
+conversation = ConversationContext()
+# Older messages per guild, recalled by similarity
+memory = VectorMemory()
+# Built from the registered commands; setup_ai binds the bot
+system_prompt_template = SystemPrompt()
 
 load_dotenv()
-client = Together(api_key=os.getenv("TOGETHER_API_KEY"))
 BOT_PREFIX = '-'  # Command prefix
 
-def get_ai_response(prompt, context=""):
+# Async request limits
+AI_MAX_CONCURRENCY = int(os.getenv("AI_MAX_CONCURRENCY", "8"))  # Max upstream calls in flight
+AI_TIMEOUT = float(os.getenv("AI_TIMEOUT", "30"))  # Seconds a request may take, retries included
+AI_FAILOVER_AFTER = float(os.getenv("AI_FAILOVER_AFTER", "8"))  # Seconds before the fallback tier is started alongside
+
+# Retries and circuit breaker
+AI_RETRIES = int(os.getenv("AI_RETRIES", "2"))  # Extra attempts for retryable errors
+AI_BREAKER_THRESHOLD = int(os.getenv("AI_BREAKER_THRESHOLD", "5"))  # Consecutive failures before failing fast
+AI_BREAKER_RESET = float(os.getenv("AI_BREAKER_RESET", "30"))  # Seconds before a trial call is allowed
+AI_POOL_SIZE = int(os.getenv("AI_POOL_SIZE", "20"))  # Pooled keep-alive connections to the API
+FALLBACK_REPLY = "My AI brain is having trouble right now. Please try again in a minute."
+
+
+class EmptyReplyError(Exception):
+    """The model answered with nothing but whitespace."""
+
+# The SDK retries nothing on the async path; retries are handled below
+client = AsyncTogether(api_key=os.getenv("TOGETHER_API_KEY"), timeout=AI_TIMEOUT, max_retries=0)
+breakers = {}  # model -> CircuitBreaker
+error_counts = Counter()  # Upstream errors by exception class
+http_session = None
+
+ai_semaphore = asyncio.Semaphore(AI_MAX_CONCURRENCY)
+active_requests = 0  # Upstream calls in flight
+last_request_at = 0.0  # time.monotonic() of the latest upstream call
+
+# Completion cache
+AI_CACHE_TTL = int(os.getenv("AI_CACHE_TTL", "3600"))  # Seconds a cached answer stays valid
+AI_CACHE_MAX_ENTRIES = int(os.getenv("AI_CACHE_MAX_ENTRIES", "1024"))
+AI_CACHE_MAX_BYTES = int(os.getenv("AI_CACHE_MAX_BYTES", "2000000"))
+response_cache = ResponseCache(AI_CACHE_MAX_ENTRIES, AI_CACHE_MAX_BYTES, AI_CACHE_TTL)
+
+# Identical requests in flight share one upstream call
+inflight = {}  # cache key -> [task, number of callers waiting on it]
+
+def _finish_shared(key, entry):
+    if inflight.get(key) is entry:
+        del inflight[key]
+    # Mark the error as retrieved in case every waiter was cancelled
+    task = entry[0]
+    if not task.cancelled():
+        task.exception()
+
+async def _complete_shared(key, messages, timeout, **settings):
+    entry = inflight.get(key)
+    if entry is None:
+        task = asyncio.create_task(_complete(messages=messages, timeout=timeout, **settings))
+        entry = inflight[key] = [task, 0]
+        task.add_done_callback(lambda t: _finish_shared(key, entry))
+    entry[1] += 1
+    try:
+        # Shield so one caller cancelling does not cancel the call for the others
+        return await asyncio.shield(entry[0])
+    finally:
+        entry[1] -= 1
+        # The last caller gave up (e.g. a tier that lost a failover race): stop paying for the call
+        if entry[1] == 0 and not entry[0].done():
+            entry[0].cancel()
+            if inflight.get(key) is entry:
+                del inflight[key]
+
+# Shared keep-alive connection pool for the SDK's async requests
+async def _use_http_session():
+    global http_session
+    if http_session is None or http_session.closed:
+        connector = aiohttp.TCPConnector(limit=AI_POOL_SIZE, keepalive_timeout=60)
+        http_session = aiohttp.ClientSession(connector=connector)
+    # The SDK reads its session from this context variable, scoped to the current task
+    together.aiosession.set(http_session)
+
+def get_breaker(model):
+    if model not in breakers:
+        breakers[model] = CircuitBreaker(AI_BREAKER_THRESHOLD, AI_BREAKER_RESET)
+    return breakers[model]
+
+# Run an upstream call with retries and the model's circuit breaker.
+# call() starts the request; it is retried only on retryable errors.
+# limit=False when the caller already holds a concurrency slot.
+async def _with_retries(call, model, timeout, limit=True):
+    """Run call() with retries, all within one deadline of `timeout` seconds."""
+    global active_requests, last_request_at
+    breaker = get_breaker(model)
+    if not breaker.allow():
+        raise CircuitOpenError(f"AI circuit breaker is open for {model}")
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout
+    called = False  # Whether upstream was reached at all, so queueing alone never trips the breaker
     try:
-        system_prompt = textwrap.dedent(f"""
-        About Yourself:
-        1. You are Coco, a helpful AI assistant.
-        2. You can answer questions, provide info, and assist with tasks.
-        3. You are friendly, short, and professional.
-        4. You are developed by Ayanokouji.
-
-        Response Rules:
-        1. Be short but helpful (1-3 lines)
-        2. Use past chat (conversation history)
-        3. For next questions, continue naturally
-
-        Bot Commands:
-
-        Moderation:
-        {BOT_PREFIX}kick @user [reason]
-        {BOT_PREFIX}ban @user [reason]
-        {BOT_PREFIX}unban user_id
-        {BOT_PREFIX}timeout @user 10s/m/h
-        {BOT_PREFIX}untimeout @user
-        {BOT_PREFIX}warn @user [reason]
-        {BOT_PREFIX}warnings @user
-        {BOT_PREFIX}clearwarnings @user
-        {BOT_PREFIX}purge 2
-        {BOT_PREFIX}snipe
-        {BOT_PREFIX}lock #channel
-        {BOT_PREFIX}unlock #channel
-        {BOT_PREFIX}slowmode #channel 10s/m/h
-        {BOT_PREFIX}hide #channel
-        {BOT_PREFIX}unhide #channel
-        {BOT_PREFIX}nuke #channel
-        {BOT_PREFIX}addrole @user @role
-        {BOT_PREFIX}removerole @user @role
-        {BOT_PREFIX}addemoji :emoji:
-
-        Utility:
-        {BOT_PREFIX}ping
-        {BOT_PREFIX}uptime
-        {BOT_PREFIX}help
-        {BOT_PREFIX}userinfo @user
-        {BOT_PREFIX}avatar @user
-        {BOT_PREFIX}serverinfo
-        {BOT_PREFIX}roleinfo @role
-        {BOT_PREFIX}emojis
-        {BOT_PREFIX}boosts
-        {BOT_PREFIX}say Hello
-        {BOT_PREFIX}remindme 10m Take a break
-        {BOT_PREFIX}invite
-        {BOT_PREFIX}support
-        {BOT_PREFIX}suggest
-
-        AI:
-        {BOT_PREFIX}aichannel #channel
-        {BOT_PREFIX}ask What is AI?
-        {BOT_PREFIX}clearhistory
-        """).strip()
-
-        full_context = textwrap.dedent(f"""
-        === CHAT HISTORY ===
-        {context}
-
-        === NEW MESSAGE ===
-        {prompt}
-        """).strip()
-
-        response = client.chat.completions.create(
-            model="meta-llama/Llama-3-70b-chat-hf",
-            messages=[
-                {"role": "system", "content": system_prompt},
-                {"role": "assistant", "content": context if context else "New chat started"},
-                {"role": "user", "content": prompt}
-            ],
-            temperature=0.7,
-            max_tokens=500,
+        for attempt in range(AI_RETRIES + 1):
+            try:
+                async with ai_semaphore if limit else nullcontext():
+                    await _use_http_session()
+                    remaining = deadline - loop.time()
+                    if remaining <= 0:
+                        raise asyncio.TimeoutError()  # Queued for the whole budget
+                    called = True
+                    active_requests += 1
+                    last_request_at = time.monotonic()
+                    try:
+                        # Each attempt gets what is left of the budget; wait_for cancels the request
+                        # on timeout, and caller cancellation propagates the same way
+                        result = await asyncio.wait_for(call(), timeout=remaining)
+                    finally:
+                        active_requests -= 1
+                breaker.success()
+                return result
+            except Exception as e:
+                error_counts[type(e).__name__] += 1
+                if not is_retryable(e):
+                    breaker.success()  # Upstream answered; the request itself was bad
+                    raise
+                delay = backoff(attempt)
+                # Give up once there is no retry left, or the wait alone would use up the budget
+                if attempt == AI_RETRIES or delay >= deadline - loop.time():
+                    if called:
+                        breaker.failure()
+                    raise
+                await asyncio.sleep(delay)
+    finally:
+        breaker.release()
+
+# Send one chat completion upstream without blocking the event loop
+async def _complete(messages, model, temperature, max_tokens, timeout):
+    response = await _with_retries(
+        lambda: client.chat.completions.create(
+            model=model,
+            messages=messages,
+            temperature=temperature,
+            max_tokens=max_tokens,
+        ),
+        model,
+        timeout,
+    )
+    reply = (response.choices[0].message.content or "").strip()
+    if not reply:
+        raise EmptyReplyError(f"{model} returned an empty reply")
+    return reply
+
+# Stream a chat completion token by token; timeout bounds the whole stream, retries included.
+# Opening the stream is retried; errors after the first token are not.
+async def _stream(messages, model, temperature, max_tokens, timeout):
+    global active_requests, last_request_at
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout
+    async with ai_semaphore:
+        stream = await _with_retries(
+            lambda: client.chat.completions.create(
+                model=model,
+                messages=messages,
+                temperature=temperature,
+                max_tokens=max_tokens,
+                stream=True,
+            ),
+            model,
+            deadline - loop.time(),
+            limit=False,
         )
-        return response.choices[0].message.content.strip()
+        active_requests += 1
+        last_request_at = time.monotonic()
+        try:
+            chunks = stream.__aiter__()
+            while True:
+                try:
+                    chunk = await asyncio.wait_for(chunks.__anext__(), timeout=max(deadline - loop.time(), 0))
+                except StopAsyncIteration:
+                    break
+                if chunk.choices and chunk.choices[0].delta and chunk.choices[0].delta.content:
+                    yield chunk.choices[0].delta.content
+        except Exception as e:
+            error_counts[type(e).__name__] += 1
+            raise
+        finally:
+            active_requests -= 1
+            await stream.aclose()
+
+# Summaries run in the background with a small, uncached completion on the fast tier
+async def _summarize(messages):
+    return await _complete(
+        messages=messages,
+        model=TIERS["fast"]["model"],
+        temperature=0.3,
+        max_tokens=200,
+        timeout=AI_TIMEOUT,
+    )
+
+summarizer = Summarizer(conversation, _summarize, lambda: (active_requests, last_request_at))
+
+# Build the role-tagged messages and model settings for one request.
+# context is the replied-to message; channel_id pulls in that channel's history;
+# recalled holds relevant older messages from the guild's vector memory;
+# tier picks the model and token cap from the router.
+def build_request(prompt, context="", channel_id=None, recalled=(), tier="primary"):
+    system_prompt = system_prompt_template.get()
+
+    notes = [f"The user is replying to this message:\n{context}"] if context else []
+    if recalled:
+        notes.append("Relevant earlier messages:\n" + "\n".join(f"- {text}" for text in recalled))
+    messages = conversation.build(channel_id, system_prompt, prompt, notes)
+    settings = {"model": TIERS[tier]["model"], "temperature": 0.7, "max_tokens": TIERS[tier]["max_tokens"]}
+    return messages, settings
+
+# Look up older guild messages similar to the prompt, skipping ones still in history
+async def recall(guild_id, prompt, channel_id=None):
+    if not guild_id:
+        return []
+    try:
+        # Search runs in a thread; the matrix product releases the GIL
+        hits = await asyncio.to_thread(memory.recall, guild_id, prompt)
     except Exception as e:
-        print(f"AI Error: {e}")
-        return "Oops! Something went wrong."
+        print(f"AI Memory Error: {e}")
+        return []
+    recent = {turn.content for turn in conversation.turns(channel_id)}
+    return [hit for hit in hits if hit not in recent]
 
-# Update conversation history
-async def update_history(channel_id, author, message, is_bot=False):
-    if channel_id not in conversation_history:
-        conversation_history[channel_id] = []
+# Reply for a failed request: a stale cached answer if there is one, else an error message
+def _fallback_reply(key, e, timeout):
+    if key is not None:
+        stale = response_cache.get(key, allow_stale=True)
+        if stale is not None:
+            return stale
+    if isinstance(e, (CircuitOpenError, EmptyReplyError)):
+        return FALLBACK_REPLY
+    if isinstance(e, asyncio.TimeoutError):
+        print(f"AI Timeout: no response after {timeout}s")
+        return "Sorry, that took too long. Please try again."
+    print(f"AI Error: {e}")
+    return "Oops! Something went wrong."
+
+# Answer from the cache or one upstream call on the given settings
+async def _respond(messages, settings, timeout, use_cache):
+    if not use_cache:
+        return await _complete(messages=messages, timeout=timeout, **settings)
+
+    key = make_key(messages, **settings)
+    cached = response_cache.get(key)
+    if cached is not None:
+        return cached
 
-    prefix = "🤖 Coco" if is_bot else f"👤 {author.display_name}"
-    entry = f"{prefix}: {message}"
-    conversation_history[channel_id].append(entry)
-    conversation_history[channel_id] = conversation_history[channel_id][-MAX_HISTORY:]
+    reply = await _complete_shared(key, messages, timeout, **settings)
+    response_cache.set(key, reply)
+    return reply
+
+# The routed tier first, then its fallback tier
+def _tiers(prompt, channel_id):
+    tier = route(prompt, channel_id)
+    return [tier, FALLBACK_TIERS[tier]] if tier in FALLBACK_TIERS else [tier]
+
+# Hedged failover: calls[0] starts at once; the next one starts when every running call
+# has failed or after AI_FAILOVER_AFTER seconds without an answer. The first answer wins,
+# the rest are cancelled, and timeout bounds the whole race. Each call(remaining) is
+# given the time left of that budget.
+async def _race(calls, timeout):
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout
+    waiting = list(calls)
+    running = set()
+    error = None
+    try:
+        while True:
+            if waiting:
+                running.add(asyncio.create_task(waiting.pop(0)(deadline - loop.time())))
+            if not running:
+                raise error
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                raise asyncio.TimeoutError()
+            done, running = await asyncio.wait(
+                running,
+                timeout=min(AI_FAILOVER_AFTER, remaining) if waiting else remaining,
+                return_when=asyncio.FIRST_COMPLETED,
+            )
+            for task in done:
+                if task.exception() is None:
+                    return task.result()
+                error = task.exception()
+            if not done and not waiting:
+                raise asyncio.TimeoutError()
+    finally:
+        for task in running:
+            task.cancel()
+
+# use_cache=False skips the completion cache for answers that should vary
+async def get_ai_response(prompt, context="", timeout=AI_TIMEOUT, use_cache=True, channel_id=None, guild_id=None):
+    keys = []
+    error = None
+
+    def tier_call(messages, settings):
+        async def call(remaining):
+            try:
+                return await _respond(messages, settings, remaining, use_cache)
+            except Exception as e:
+                print(f"AI {settings['model']} failed: {e!r}")
+                raise
+        return call
+
+    try:
+        recalled = await recall(guild_id, prompt, channel_id)
+        calls = []
+        for tier in _tiers(prompt, channel_id):
+            messages, settings = build_request(prompt, context, channel_id, recalled, tier)
+            keys.append(make_key(messages, **settings))
+            calls.append(tier_call(messages, settings))
+        return await _race(calls, timeout)
+    except Exception as e:
+        error = e
+    return _fallback_reply(keys[0] if keys and use_cache else None, error, timeout)
+
+# Stream a reply as text chunks; a cache hit arrives as a single chunk
+# Failover: a tier that has not started answering within AI_FAILOVER_AFTER is dropped for the
+# next one; timeout bounds all tiers together
+async def stream_ai_response(prompt, context="", timeout=AI_TIMEOUT, use_cache=True, channel_id=None, guild_id=None):
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout
+    recalled = await recall(guild_id, prompt, channel_id)
+    keys = []
+    error = None
+    tiers = _tiers(prompt, channel_id)
+    for i, tier in enumerate(tiers):
+        messages, settings = build_request(prompt, context, channel_id, recalled, tier)
+        key = make_key(messages, **settings)
+        keys.append(key)
+        if use_cache:
+            cached = response_cache.get(key)
+            if cached is not None:
+                yield cached
+                return
+
+        parts = []
+        started = False  # Leading whitespace is held back until real text arrives
+        chunks = _stream(messages=messages, timeout=deadline - loop.time(), **settings)
+        try:
+            while True:
+                wait = deadline - loop.time()
+                if not started and i + 1 < len(tiers):
+                    wait = min(wait, AI_FAILOVER_AFTER)
+                try:
+                    chunk = await asyncio.wait_for(chunks.__anext__(), timeout=max(wait, 0))
+                except StopAsyncIteration:
+                    break
+                parts.append(chunk)
+                if started:
+                    yield chunk
+                elif chunk.strip():
+                    started = True
+                    yield "".join(parts)
+            if not started:
+                raise EmptyReplyError(f"{settings['model']} streamed an empty reply")
+        except Exception as e:
+            if started:
+                return  # Part of the answer is already out; keep it
+            print(f"AI {settings['model']} failed, trying fallback: {e!r}")
+            error = e
+            continue
+        finally:
+            await chunks.aclose()
+
+        if use_cache:
+            response_cache.set(key, "".join(parts).strip())
+        return
+
+    yield _fallback_reply(keys[0] if use_cache else None, error, timeout)
+
+# Update conversation history
+async def update_history(channel_id, author, message, is_bot=False, guild_id=None):
+    if not message or not message.strip():
+        return  # Nothing was said; an empty turn only wastes prompt budget
+    if is_bot:
+        conversation.add(channel_id, "assistant", message)
+    else:
+        entry = f"{author.display_name}: {message}"
+        conversation.add(channel_id, "user", entry)
+    summarizer.notify(channel_id)
+    # User messages also go to the guild's long-term vector memory; the disk writes run off the event loop
+    if guild_id and not is_bot:
+        try:
+            await asyncio.to_thread(memory.remember, guild_id, entry)
+        except Exception as e:
+            print(f"AI Memory Error: {e}")
 
 async def get_history(channel_id):
-    return "\n".join(conversation_history.get(channel_id, ["No history yet"]))
+    turns = conversation.turns(channel_id)
+    if not turns:
+        return "No history yet"
+    return "\n".join(turn.content for turn in turns)
+
+async def clear_history(channel_id):
+    conversation.clear(channel_id)
 
 
 # 🚫 Avoid double replies, especially with -ask and replies
 async def handle_discord_message(message):
-    # Skip if not in 'aichannel' or is a bot
-    if message.channel.name.lower() != "aichannel" or message.author.bot:
+    # Skip if not in an AI channel or is a bot
+    if routes.get(message.channel.id) != ROUTE_AI or message.author.bot:
         return
 
     # 🚫 Skip if message is a reply to bot (avoid double response)
-    if message.reference:
-        try:
-            replied_message = await message.channel.fetch_message(message.reference.message_id)
-            if replied_message and replied_message.author.bot:
-                return
-        except:
-            pass  # just in case reply fetch fails
+    replied_message = await resolve_reference(message)
+    if replied_message and replied_message.author.bot:
+        return
 
     # 🚫 Skip commands like -ask, -help, etc.
     if message.content.startswith(BOT_PREFIX):
         return
 
-    # Update history with user message
-    await update_history(message.channel.id, message.author, message.content)
-
     async with message.channel.typing():
-        history = await get_history(message.channel.id)
-        reply = get_ai_response(message.content, history)
+        reply = await get_ai_response(message.content, channel_id=message.channel.id, guild_id=message.guild.id)
         sent = await message.channel.send(reply)
-        await update_history(message.channel.id, sent.author, reply, is_bot=True)
+
+    # Update history with the exchange
+    await update_history(message.channel.id, message.author, message.content, guild_id=message.guild.id)
+    await update_history(message.channel.id, sent.author, reply, is_bot=True)
@@ -0,0 +1,76 @@
+import os
+from collections import deque
+from dotenv import load_dotenv
+
+load_dotenv()
+AI_HISTORY_TURNS = int(os.getenv("AI_HISTORY_TURNS", "50"))  # Turns kept per channel
+AI_PROMPT_TOKEN_BUDGET = int(os.getenv("AI_PROMPT_TOKEN_BUDGET", "1500"))  # Max prompt tokens per request
+
+
+def estimate_tokens(text):
+    # Rough local estimate: about 4 characters per token for English text
+    return len(text) // 4 + 1
+
+
+class Turn:
+    __slots__ = ("role", "content", "tokens")
+
+    def __init__(self, role, content):
+        self.role = role
+        self.content = content
+        self.tokens = estimate_tokens(content)
+
+
+class ConversationContext:
+    """Per-channel chat history packed into prompts under a token budget."""
+
+    def __init__(self, max_turns=AI_HISTORY_TURNS, budget=AI_PROMPT_TOKEN_BUDGET):
+        self.max_turns = max_turns
+        self.budget = budget
+        self.channels = {}  # channel_id -> deque of Turn
+        self.summaries = {}  # channel_id -> running summary of older turns
+
+    def add(self, channel_id, role, content):
+        turns = self.channels.get(channel_id)
+        if turns is None:
+            turns = self.channels[channel_id] = deque(maxlen=self.max_turns)
+        turns.append(Turn(role, content))
+
+    def turns(self, channel_id):
+        return self.channels.get(channel_id, ())
+
+    def clear(self, channel_id):
+        self.channels.pop(channel_id, None)
+        self.summaries.pop(channel_id, None)
+
+    def fold(self, channel_id, turns, summary):
+        """Replace the given oldest turns with an updated running summary."""
+        current = self.channels.get(channel_id)
+        if current is None:
+            return  # History was cleared meanwhile
+        self.summaries[channel_id] = summary
+        folded = set(map(id, turns))
+        # Turns may have been added (or trimmed) meanwhile; drop only the folded ones
+        while current and id(current[0]) in folded:
+            current.popleft()
+
+    def build(self, channel_id, system_prompt, prompt, notes=()):
+        """Return role-tagged messages: system prompt, running summary, notes,
+        as many recent turns as fit the budget, then the new user prompt."""
+        head = [{"role": "system", "content": system_prompt}]
+        summary = self.summaries.get(channel_id)
+        if summary:
+            head.append({"role": "system", "content": f"Summary of the earlier conversation:\n{summary}"})
+        head += [{"role": "system", "content": note} for note in notes if note]
+        remaining = self.budget - estimate_tokens(prompt) - sum(estimate_tokens(m["content"]) for m in head)
+
+        # Walk back from the newest turn until the budget runs out
+        picked = []
+        for turn in reversed(self.turns(channel_id)):
+            if turn.tokens > remaining:
+                break
+            remaining -= turn.tokens
+            picked.append({"role": turn.role, "content": turn.content})
+        picked.reverse()
+
+        return head + picked + [{"role": "user", "content": prompt}]
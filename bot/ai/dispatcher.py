@@ -0,0 +1,67 @@
+import os
+import asyncio
+from dotenv import load_dotenv
+
+load_dotenv()
+AI_WORKERS = int(os.getenv("AI_WORKERS", "4"))  # Worker tasks serving AI requests
+AI_QUEUE_SIZE = int(os.getenv("AI_QUEUE_SIZE", "100"))  # Max messages waiting across all channels
+AI_MAX_BATCH = int(os.getenv("AI_MAX_BATCH", "5"))  # Max queued messages merged into one request
+
+
+class AIDispatcher:
+    """Bounded AI work queue served by a worker pool.
+
+    Messages are grouped per channel. A channel is handed to at most one
+    worker at a time, so replies stay in order, and everything that piled up
+    while it waited is merged into a single request.
+    """
+
+    def __init__(self, handler, workers=AI_WORKERS, max_pending=AI_QUEUE_SIZE, max_batch=AI_MAX_BATCH):
+        self.handler = handler  # async handler(messages) for one channel's batch
+        self.workers = workers
+        self.max_pending = max_pending
+        self.max_batch = max_batch
+        self.pending = {}  # channel_id -> list of waiting messages
+        self.scheduled = set()  # channel ids queued or being served
+        self.size = 0  # Total waiting messages
+        self.ready = asyncio.Queue()  # Channel ids with work, one entry per channel
+        self.tasks = []
+
+    def submit(self, message):
+        """Queue a message. Returns False when the queue is full."""
+        if self.size >= self.max_pending:
+            return False
+        self._ensure_workers()
+
+        channel_id = message.channel.id
+        self.pending.setdefault(channel_id, []).append(message)
+        self.size += 1
+        if channel_id not in self.scheduled:
+            self.scheduled.add(channel_id)
+            self.ready.put_nowait(channel_id)
+        return True
+
+    def _ensure_workers(self):
+        # Workers are started lazily so they bind to the running loop
+        if not self.tasks:
+            self.tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+
+    async def _worker(self):
+        while True:
+            channel_id = await self.ready.get()
+            queue = self.pending.get(channel_id, [])
+            batch = queue[:self.max_batch]
+            del queue[:self.max_batch]
+            self.size -= len(batch)
+            try:
+                if batch:
+                    await self.handler(batch)
+            except Exception as e:
+                print(f"AI Dispatch Error: {e}")
+            finally:
+                # Requeue the channel if more arrived while we were busy
+                if self.pending.get(channel_id):
+                    self.ready.put_nowait(channel_id)
+                else:
+                    self.pending.pop(channel_id, None)
+                    self.scheduled.discard(channel_id)
@@ -0,0 +1,158 @@
+import os
+import re
+import json
+import zlib
+import threading
+import numpy as np
+from dotenv import load_dotenv
+
+load_dotenv()
+AI_MEMORY_DIR = os.getenv("AI_MEMORY_DIR", "data/memory")  # One folder per guild
+AI_MEMORY_DIM = int(os.getenv("AI_MEMORY_DIM", "64"))  # Embedding size; larger is more precise but slower
+AI_MEMORY_TOP_K = int(os.getenv("AI_MEMORY_TOP_K", "3"))  # Past messages injected per request
+AI_MEMORY_MIN_SCORE = float(os.getenv("AI_MEMORY_MIN_SCORE", "0.4"))  # Cosine similarity cutoff
+
+WORD_RE = re.compile(r"\w+")
+SEARCH_CHUNK = 8192  # Rows scored per step; keeps the float32 scratch block in cache
+
+
+def feature_counts(text, dim=AI_MEMORY_DIM):
+    """Signed counts of hashed words and word pairs (the unnormalized embedding)."""
+    counts = np.zeros(dim, dtype=np.int32)
+    words = WORD_RE.findall(text.lower())
+    for feature in words + [f"{a} {b}" for a, b in zip(words, words[1:])]:
+        # crc32 is stable across restarts, unlike hash()
+        h = zlib.crc32(feature.encode())
+        counts[h % dim] += 1 if h & 0x80000000 else -1
+    return counts
+
+
+def embed(text, dim=AI_MEMORY_DIM):
+    """Local hashing embedding of words and word pairs, L2-normalized."""
+    vec = feature_counts(text, dim).astype(np.float32)
+    norm = np.linalg.norm(vec)
+    return vec / norm if norm else vec
+
+
+class GuildMemory:
+    """Append-only store of one guild's messages.
+
+    Embeddings are stored unnormalized as int8 counts in a column-major
+    memory map (one column per dimension) with each row's inverse norm
+    beside it. A search reads only the columns where the query is non-zero,
+    usually a fraction of the matrix, at a quarter of float32's bytes.
+    Texts stay on disk; an offsets file locates each one, so only the top
+    hits are read back.
+
+    The map grows by building a bigger copy and swapping it in under the
+    lock, so searches in worker threads always see a consistent map.
+    """
+
+    def __init__(self, path, dim=AI_MEMORY_DIM):
+        os.makedirs(path, exist_ok=True)
+        self.dim = dim
+        self.lock = threading.Lock()
+        self.vector_path = os.path.join(path, "vectors.i8")
+        self.norm_path = os.path.join(path, "norms.f32")
+        self.text_path = os.path.join(path, "texts.jsonl")
+        offset_path = os.path.join(path, "offsets.u64")
+
+        # The offsets file decides the count; anything written after the last offset is ignored
+        self.count = os.path.getsize(offset_path) // 16 if os.path.exists(offset_path) else 0
+        self.offset_file = open(offset_path, "ab")
+        self.text_file = open(self.text_path, "ab")
+        self.text_fd = os.open(self.text_path, os.O_RDONLY)
+
+        capacity = os.path.getsize(self.vector_path) // dim if os.path.exists(self.vector_path) else 0
+        self._remap(max(1024, capacity, self.count))
+
+    def _remap(self, capacity):
+        # Column-major, so a bigger map is a new file: copy the old columns, then swap it in
+        old = getattr(self, "vectors", None)
+        if old is not None and capacity > self.capacity:
+            tmp_path = self.vector_path + ".tmp"
+            grown = np.memmap(tmp_path, dtype=np.int8, mode="w+", shape=(self.dim, capacity))
+            grown[:, :self.count] = old[:, :self.count]
+            grown.flush()
+            os.replace(tmp_path, self.vector_path)
+        elif not os.path.exists(self.vector_path) or os.path.getsize(self.vector_path) < capacity * self.dim:
+            with open(self.vector_path, "ab") as f:
+                f.truncate(capacity * self.dim)
+        with open(self.norm_path, "ab") as f:
+            if f.tell() < capacity * 4:
+                f.truncate(capacity * 4)
+        vectors = np.memmap(self.vector_path, dtype=np.int8, mode="r+", shape=(self.dim, capacity))
+        norms = np.memmap(self.norm_path, dtype=np.float32, mode="r+", shape=(capacity,))
+        self.vectors, self.inv_norms, self.capacity = vectors, norms, capacity
+
+    def add(self, text):
+        """Blocking disk writes; call from a worker thread."""
+        counts = feature_counts(text, self.dim)
+        norm = np.linalg.norm(counts)
+        line = (json.dumps(text) + "\n").encode("utf-8")
+        with self.lock:
+            if self.count == self.capacity:
+                self._remap(self.capacity * 2)
+            row = self.count
+            self.vectors[:, row] = np.clip(counts, -127, 127)
+            self.inv_norms[row] = 1.0 / norm if norm else 0.0
+            offset = self.text_file.seek(0, os.SEEK_END)
+            self.text_file.write(line)
+            self.text_file.flush()
+            # Written last: a crash before this line leaves the row unused
+            self.offset_file.write(np.array([offset, len(line)], dtype=np.uint64).tobytes())
+            self.offset_file.flush()
+            self.count += 1
+
+    def _text(self, row):
+        offset, length = np.fromfile(self.offset_file.name, dtype=np.uint64, count=2, offset=row * 16)
+        return json.loads(os.pread(self.text_fd, int(length), int(offset)))
+
+    def search(self, text, k=AI_MEMORY_TOP_K, min_score=-1.0):
+        """Return up to k (score, text) pairs scoring at least min_score, best first."""
+        with self.lock:
+            vectors, inv_norms, count = self.vectors, self.inv_norms, self.count
+        query = embed(text, self.dim)
+        dims = np.flatnonzero(query)
+        if not count or not len(dims):
+            return []
+
+        weights = query[dims]
+        scores = np.empty(count, dtype=np.float32)
+        block = np.empty((len(dims), min(SEARCH_CHUNK, count)), dtype=np.float32)
+        for start in range(0, count, SEARCH_CHUNK):
+            stop = min(start + SEARCH_CHUNK, count)
+            part = block[:, :stop - start]
+            np.copyto(part, vectors[dims, start:stop], casting="unsafe")
+            np.dot(weights, part, out=scores[start:stop])
+        scores *= inv_norms[:count]
+
+        top = np.flatnonzero(scores >= min_score)
+        if len(top) > k:
+            top = top[np.argpartition(scores[top], -k)[-k:]]
+        top = top[np.argsort(scores[top])[::-1]]
+        return [(float(scores[i]), self._text(i)) for i in top]
+
+
+class VectorMemory:
+    """Per-guild vector stores, opened on first use."""
+
+    def __init__(self, root=AI_MEMORY_DIR):
+        self.root = root
+        self.guilds = {}  # guild_id -> GuildMemory
+        self.lock = threading.Lock()  # Stores are opened from worker threads
+
+    def _guild(self, guild_id):
+        memory = self.guilds.get(guild_id)
+        if memory is None:
+            with self.lock:
+                memory = self.guilds.get(guild_id)
+                if memory is None:
+                    memory = self.guilds[guild_id] = GuildMemory(os.path.join(self.root, str(guild_id)))
+        return memory
+
+    def remember(self, guild_id, text):
+        self._guild(guild_id).add(text)
+
+    def recall(self, guild_id, text, k=AI_MEMORY_TOP_K, min_score=AI_MEMORY_MIN_SCORE):
+        return [hit for _, hit in self._guild(guild_id).search(text, k, min_score)]
@@ -0,0 +1,83 @@
+import textwrap
+from discord.ext import commands
+from bot.ai.context import estimate_tokens
+
+ABOUT = textwrap.dedent("""
+About Yourself:
+1. You are Coco, a helpful AI assistant.
+2. You can answer questions, provide info, and assist with tasks.
+3. You are friendly, short, and professional.
+4. You are developed by Ayanokouji.
+
+Response Rules:
+1. Be short but helpful (1-3 lines)
+2. Use past chat (conversation history)
+3. For next questions, continue naturally
+""").strip()
+
+# Command modules and the heading they get in the prompt
+CATEGORIES = {
+    "bot.commands.moderation": "Moderation",
+    "bot.commands.utility": "Utility",
+    "bot.commands.help": "Utility",
+    "bot.commands.ai": "AI",
+}
+
+
+def signature(command):
+    """command.signature with flag converters spelled out as their flags, e.g. [users: ...]."""
+    text = command.signature
+    for name, param in command.clean_params.items():
+        converter = param.converter
+        if isinstance(converter, type) and issubclass(converter, commands.FlagConverter):
+            flags = " ".join(f"[{flag.name}: ...]" for flag in converter.get_flags().values())
+            text = text.replace(f"<{name}>", flags).replace(f"[{name}]", flags)
+    return text
+
+
+class SystemPrompt:
+    """System prompt generated from the bot's registered commands.
+
+    Built once and reused for every request. Nothing is checked per
+    request: the prompt is rebuilt only when invalidate() is called, which
+    happens once commands are registered (on_ready) and should follow any
+    later add_command or remove_command.
+    """
+
+    def __init__(self):
+        self.bot = None
+        self.text = ABOUT
+        self.tokens = estimate_tokens(ABOUT)
+        self.stale = False
+
+    def bind(self, bot):
+        self.bot = bot
+        self.stale = True
+
+    def invalidate(self):
+        self.stale = True
+
+    def get(self):
+        if self.stale:
+            self.rebuild()
+        return self.text
+
+    def rebuild(self):
+        self.stale = False
+        prefix = self.bot.command_prefix if isinstance(self.bot.command_prefix, str) else "/"
+        sections = {}
+        for command in sorted(self.bot.walk_commands(), key=lambda c: c.qualified_name):
+            if command.hidden:
+                continue
+            heading = CATEGORIES.get(command.callback.__module__, "Other")
+            line = f"{prefix}{command.qualified_name} {signature(command)}".strip()
+            if command.short_doc:
+                line += f" - {command.short_doc}"
+            sections.setdefault(heading, []).append(line)
+
+        parts = [ABOUT, f"Bot Commands ({prefix}help opens a menu with the details):"]
+        for heading in dict.fromkeys(list(CATEGORIES.values()) + ["Other"]):
+            if heading in sections:
+                parts.append(f"{heading}:\n" + "\n".join(sections[heading]))
+        self.text = "\n\n".join(parts)
+        self.tokens = estimate_tokens(self.text)
@@ -0,0 +1,74 @@
+import time
+import random
+import asyncio
+from together import error
+
+RETRYABLE_STATUS = {408, 409, 429, 500, 502, 503, 504}
+RETRYABLE_ERRORS = (
+    asyncio.TimeoutError,
+    error.Timeout,
+    error.APIConnectionError,
+    error.RateLimitError,
+    error.ServiceUnavailableError,
+)
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling upstream while the breaker is open."""
+
+
+def is_retryable(e):
+    return isinstance(e, RETRYABLE_ERRORS) or getattr(e, "http_status", None) in RETRYABLE_STATUS
+
+
+def backoff(attempt, base=0.5, cap=8.0):
+    # Exponential backoff with full jitter
+    return random.uniform(0, min(cap, base * 2 ** attempt))
+
+
+class CircuitBreaker:
+    """Fails fast after repeated upstream failures.
+
+    After `threshold` consecutive failures the breaker opens for `reset_after`
+    seconds. Then one trial call is let through: success closes it again,
+    failure reopens it.
+    """
+
+    def __init__(self, threshold=5, reset_after=30.0):
+        self.threshold = threshold
+        self.reset_after = reset_after
+        self.failures = 0
+        self.opened_at = None
+        self.trial = False  # A half-open trial call is in flight
+
+    @property
+    def state(self):
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at >= self.reset_after:
+            return "half-open"
+        return "open"
+
+    def allow(self):
+        state = self.state
+        if state == "closed":
+            return True
+        if state == "half-open" and not self.trial:
+            self.trial = True
+            return True
+        return False
+
+    def success(self):
+        self.failures = 0
+        self.opened_at = None
+        self.trial = False
+
+    def failure(self):
+        self.failures += 1
+        if self.trial or self.failures >= self.threshold:
+            self.opened_at = time.monotonic()
+        self.trial = False
+
+    def release(self):
+        # End a trial that was cancelled before it could succeed or fail
+        self.trial = False
@@ -0,0 +1,43 @@
+import os
+import re
+from dotenv import load_dotenv
+
+load_dotenv()
+AI_PRIMARY_MODEL = os.getenv("AI_PRIMARY_MODEL", "meta-llama/Llama-3-70b-chat-hf")
+AI_FAST_MODEL = os.getenv("AI_FAST_MODEL", "meta-llama/Llama-3-8b-chat-hf")
+AI_FAST_MAX_CHARS = int(os.getenv("AI_FAST_MAX_CHARS", "160"))  # Longest prompt sent to the fast tier
+
+# Model tiers: model plus token cap
+TIERS = {
+    "fast": {"model": AI_FAST_MODEL, "max_tokens": 200},
+    "primary": {"model": AI_PRIMARY_MODEL, "max_tokens": 500},
+}
+# Tier tried next when one is erroring or too slow
+FALLBACK_TIERS = {"primary": "fast", "fast": "primary"}
+
+# Prompts that need the bigger model even when short
+COMPLEX_RE = re.compile(
+    r"```|\b(explain|why|how does|compare|difference|write|code|debug|error|step by step|"
+    r"essay|story|poem|translate|summari[sz]e|calculate|solve)\b",
+    re.IGNORECASE,
+)
+
+channel_tiers = {}  # channel_id -> tier forced by the aimodel command
+
+
+def route(prompt, channel_id=None):
+    """Pick a tier: channel override first, then length and a keyword classifier."""
+    tier = channel_tiers.get(channel_id)
+    if tier:
+        return tier
+    if len(prompt) <= AI_FAST_MAX_CHARS and not COMPLEX_RE.search(prompt):
+        return "fast"
+    return "primary"
+
+
+def set_channel_tier(channel_id, tier):
+    """Force a tier for a channel; None goes back to automatic routing."""
+    if tier is None:
+        channel_tiers.pop(channel_id, None)
+    else:
+        channel_tiers[channel_id] = tier
@@ -0,0 +1,65 @@
+import os
+import asyncio
+from dotenv import load_dotenv
+
+load_dotenv()
+AI_STREAMING = os.getenv("AI_STREAMING", "true").lower() == "true"  # Edit replies as tokens arrive
+AI_STREAM_EDIT_INTERVAL = float(os.getenv("AI_STREAM_EDIT_INTERVAL", "1.0"))  # Min seconds between edits
+MESSAGE_LIMIT = 2000  # Discord message length limit
+
+
+def _split_point(text, limit=MESSAGE_LIMIT):
+    # Prefer breaking on a newline, then a space, so words are not cut
+    for sep in ("\n", " "):
+        cut = text.rfind(sep, 0, limit)
+        if cut > limit // 2:
+            return cut
+    return limit
+
+
+async def send_streamed(send, chunks, interval=AI_STREAM_EDIT_INTERVAL):
+    """Send a streamed AI reply, editing it in place as text arrives.
+
+    `send` creates a new Discord message (e.g. `message.reply` or `ctx.send`).
+    Edits are throttled to one per `interval` seconds, and the text rolls over
+    into a new message before it passes Discord's 2000 character limit.
+    Returns the full reply text.
+    """
+    loop = asyncio.get_running_loop()
+    current = None  # Message being edited
+    text = ""  # Text of the current message
+    shown = ""  # Text the current message displays right now
+    last_edit = 0.0
+    full = []
+
+    async for chunk in chunks:
+        full.append(chunk)
+        text += chunk
+
+        # Finish the current message and start a new one past the limit
+        while len(text) > MESSAGE_LIMIT:
+            cut = _split_point(text)
+            part, text = text[:cut], text[cut:].lstrip()
+            if current is None:
+                await send(part)
+            else:
+                await current.edit(content=part)
+            current, shown = None, ""
+            last_edit = loop.time()
+
+        if text.strip() and loop.time() - last_edit >= interval:
+            if current is None:
+                current = await send(text)
+            elif text != shown:
+                await current.edit(content=text)
+            shown = text
+            last_edit = loop.time()
+
+    # Flush whatever arrived since the last edit
+    if text.strip() and text != shown:
+        if current is None:
+            await send(text)
+        else:
+            await current.edit(content=text)
+
+    return "".join(full).strip()
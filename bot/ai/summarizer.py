@@ -0,0 +1,63 @@
+import os
+import time
+import asyncio
+from dotenv import load_dotenv
+
+load_dotenv()
+AI_SUMMARY_TRIGGER = int(os.getenv("AI_SUMMARY_TRIGGER", "20"))  # Turns in a channel before folding starts
+AI_SUMMARY_KEEP = int(os.getenv("AI_SUMMARY_KEEP", "8"))  # Recent turns always kept verbatim
+AI_SUMMARY_IDLE = float(os.getenv("AI_SUMMARY_IDLE", "10"))  # Seconds without AI traffic before summarizing
+AI_SUMMARY_BATCH = int(os.getenv("AI_SUMMARY_BATCH", "5"))  # Channels summarized per idle pass
+
+SUMMARY_PROMPT = (
+    "Update the running summary of a Discord chat. Merge the previous summary with the new "
+    "messages into at most 6 short lines. Keep names, facts, decisions and open questions. "
+    "Reply with the summary only."
+)
+
+
+class Summarizer:
+    """Background task that folds old turns of long conversations into a
+    running summary while the bot is idle."""
+
+    def __init__(self, conversation, complete, activity, interval=5.0):
+        self.conversation = conversation
+        self.complete = complete  # async complete(messages) -> summary text
+        self.activity = activity  # () -> (requests in flight, last request time)
+        self.interval = interval
+        self.pending = set()  # Channel ids with turns waiting to be folded
+        self.task = None
+
+    def notify(self, channel_id):
+        """Called after a turn is added; cheap enough for the hot path."""
+        if len(self.conversation.turns(channel_id)) >= AI_SUMMARY_TRIGGER:
+            self.pending.add(channel_id)
+            if self.task is None:
+                self.task = asyncio.create_task(self._run())
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            in_flight, last_request = self.activity()
+            if not self.pending or in_flight or time.monotonic() - last_request < AI_SUMMARY_IDLE:
+                continue
+            for _ in range(min(AI_SUMMARY_BATCH, len(self.pending))):
+                channel_id = self.pending.pop()
+                try:
+                    await self.summarize(channel_id)
+                except Exception as e:
+                    print(f"AI Summary Error: {e}")
+
+    async def summarize(self, channel_id):
+        turns = list(self.conversation.turns(channel_id))[:-AI_SUMMARY_KEEP]
+        if not turns:
+            return
+        previous = self.conversation.summaries.get(channel_id, "None yet")
+        transcript = "\n".join(
+            turn.content if turn.role == "user" else f"Coco: {turn.content}" for turn in turns
+        )
+        summary = await self.complete([
+            {"role": "system", "content": SUMMARY_PROMPT},
+            {"role": "user", "content": f"Previous summary:\n{previous}\n\nNew messages:\n{transcript}"},
+        ])
+        self.conversation.fold(channel_id, turns, summary)
@@ -1,55 +1,108 @@
 from discord.ext import commands
 import discord
-from bot.ai.client import get_ai_response
+import math
+from bot.ai.client import get_ai_response, stream_ai_response, response_cache, update_history, clear_history, breakers, error_counts, system_prompt_template
+from bot.ai.streaming import AI_STREAMING, send_streamed
+from bot.ai.dispatcher import AIDispatcher
+from bot.ai.router import TIERS, set_channel_tier
+from bot.utils.ratelimit import AIRateLimiter
+from bot.utils.replies import resolve_reference
+from bot.utils.guild_config import guild_config
+from bot.utils.routing import routes, ROUTE_AI
+from bot.commands.moderation import run_automod, run_antispam
 
-ai_channel = None
-chat_history = []
+ASK_TRIGGER = "-ask"  # Reply starting with this asks the AI about the replied message
+
+# Answer one channel's queued messages: merged into a single AI request in the AI channel,
+# one by one elsewhere, where each -ask reply has its own asker and referenced message
+async def answer_batch(messages):
+    if len(messages) > 1 and routes.get(messages[-1].channel.id) != ROUTE_AI:
+        for message in messages:
+            try:
+                await answer_batch([message])
+            except Exception as e:
+                print(f"AI Dispatch Error: {e}")
+        return
+    last = messages[-1]
+
+    # Get context from replied message if exists
+    replied_message = await resolve_reference(last)
+    context = replied_message.content if replied_message else None
+
+    # Remove -ask from prompt if present; merge bursts into one prompt
+    prompts = [m.content.removeprefix(ASK_TRIGGER).strip() for m in messages]
+    if len(messages) == 1:
+        prompt = prompts[0]
+    else:
+        prompt = "\n".join(f"{m.author.name}: {p}" for m, p in zip(messages, prompts))
+
+    # Only the AI channel keeps a running conversation
+    channel_id = last.channel.id if routes.get(last.channel.id) == ROUTE_AI else None
+    guild_id = last.guild.id if channel_id else None
+
+    # Reply to the latest message, streaming tokens in as they arrive
+    if AI_STREAMING:
+        response = await send_streamed(last.reply, stream_ai_response(prompt, context, channel_id=channel_id, guild_id=guild_id))
+    else:
+        response = await get_ai_response(prompt, context, channel_id=channel_id, guild_id=guild_id)
+        await last.reply(response)
+
+    # Store the exchange in history
+    if channel_id:
+        for m, p in zip(messages, prompts):
+            await update_history(channel_id, m.author, p, guild_id=guild_id)
+        await update_history(channel_id, None, response, is_bot=True)
+
+dispatcher = AIDispatcher(answer_batch)
+rate_limiter = AIRateLimiter()
+
+def cooldown_message(wait):
+    return f"⏳ Slow down! You can ask the AI again in {math.ceil(wait)}s."
+
+# Rate limit and queue a message for the AI
+async def queue_ai_message(message):
+    # Fair sharing: per-user, per-channel and per-guild limits
+    wait = rate_limiter.hit(message.author.id, message.channel.id, message.guild.id)
+    if wait:
+        # Told once per cooldown; further messages in it are dropped silently
+        if rate_limiter.should_notify(message.author.id, wait):
+            await message.reply(cooldown_message(wait), delete_after=10)
+    # Queue the request; shed load with a busy reply when the queue is full
+    elif not dispatcher.submit(message):
+        await message.reply("⏳ I'm handling a lot of questions right now. Please try again in a moment.")
 
 def setup_ai(bot):
+    # The AI system prompt lists the commands registered on this bot;
+    # it is rebuilt once every setup function has added its commands
+    system_prompt_template.bind(bot)
+
+    @bot.listen("on_ready")
+    async def rebuild_system_prompt():
+        system_prompt_template.invalidate()
+
     @bot.event
     async def on_message(message):
         if message.author.bot:
             return
 
-        # Don't trigger AI in DMs or without channel
-        if not message.guild or not message.channel:
+        # Automod and the spam detector see every guild message first; a removed message goes no further
+        if message.guild and (await run_automod(bot, message) or await run_antispam(bot, message)):
             return
 
-        # Check if message is in AI channel or is a reply containing -ask
-        is_ai_channel = ai_channel and message.channel.id == ai_channel
-        is_ask_reply = message.reference and '-ask' in message.content
-
-        if is_ai_channel or is_ask_reply:
-            # Get context from replied message if exists
-            context = None
-            if message.reference:
-                try:
-                    replied_message = await message.channel.fetch_message(message.reference.message_id)
-                    context = replied_message.content
-                except:
-                    pass
-
-            # For AI channel, store in history
-            if is_ai_channel:
-                chat_history.append(f"{message.author.name}: {message.content}")
-                if len(chat_history) > 10:
-                    chat_history.pop(0)
-
-            # Remove -ask from prompt if present
-            prompt = message.content.replace('-ask', '').strip()
-            
-            # Get AI response with context
-            response = get_ai_response(prompt, context)
-            
-            # Reply to the message
-            await message.reply(response)
-
-        # Process commands normally
+        # Commands go straight to the command processor, in any channel or DM
         if message.content.startswith(bot.command_prefix):
             await bot.process_commands(message)
+            return
+
+        # One table lookup for AI channels; -ask replies work in any guild channel
+        if routes.get(message.channel.id) == ROUTE_AI or (
+            message.guild and message.reference and message.content.startswith(ASK_TRIGGER)
+        ):
+            await queue_ai_message(message)
 
     @bot.hybrid_command(name="ask")
     async def ask(ctx: commands.Context, *, question: str = None):
+        """Ask the AI a question"""
         if not question:
             await ctx.send(embed=discord.Embed(
                 title="Error",
@@ -58,35 +111,40 @@ def setup_ai(bot):
             ))
             return
 
+        wait = rate_limiter.hit(ctx.author.id, ctx.channel.id, ctx.guild.id if ctx.guild else None)
+        if wait:
+            if rate_limiter.should_notify(ctx.author.id, wait):
+                await ctx.send(cooldown_message(wait), delete_after=10)
+            return
+
         # Check if this is a reply to get context
-        context = None
-        if ctx.message.reference:
-            try:
-                replied_message = await ctx.channel.fetch_message(ctx.message.reference.message_id)
-                context = replied_message.content
-            except:
-                pass
+        replied_message = await resolve_reference(ctx.message)
+        context = replied_message.content if replied_message else None
 
-        prompt = f"{ctx.author.name}: {question}\nAnswer concisely:"
-        response = get_ai_response(prompt, context)
-        await ctx.send(response)
+        # Keep the prompt user-independent so repeated questions hit the cache
+        prompt = f"{question}\nAnswer concisely:"
+        if AI_STREAMING:
+            await send_streamed(ctx.send, stream_ai_response(prompt, context))
+        else:
+            response = await get_ai_response(prompt, context)
+            await ctx.send(response)
 
     @bot.hybrid_command(name="aichannel")
     @commands.has_permissions(manage_channels=True)
     async def set_ai_channel(ctx: commands.Context, channel: discord.TextChannel = None):
-        global ai_channel
+        """Toggle the AI chat channel"""
         target_channel = channel or ctx.channel
 
         # Toggle behavior - if same channel is specified, disable AI
-        if ai_channel == target_channel.id:
-            ai_channel = None
+        if guild_config.get(ctx.guild.id, "ai_channel") == target_channel.id:
+            guild_config.delete(ctx.guild.id, "ai_channel")
             embed = discord.Embed(
                 title="❌ AI Channel Disabled",
                 description=f"AI responses have been **disabled** in {target_channel.mention}",
                 color=0xFF0000
             )
         else:
-            ai_channel = target_channel.id
+            guild_config.set(ctx.guild.id, "ai_channel", target_channel.id)
             embed = discord.Embed(
                 title="✅ AI Channel Enabled",
                 description=f"AI responses are now **active** in {target_channel.mention}\n\n"
@@ -100,10 +158,48 @@ def setup_ai(bot):
 
     @bot.hybrid_command(name="clearhistory")
     async def clearhistory(ctx: commands.Context):
-        global chat_history
-        chat_history = []
+        """Reset the AI chat history for this channel"""
+        await clear_history(ctx.channel.id)
         await ctx.send(embed=discord.Embed(
             title="History Cleared",
-            description="AI chat history reset",
+            description="AI chat history reset for this channel",
+            color=0x9ACD32
+        ))
+
+    @bot.hybrid_command(name="aistats")
+    async def aistats(ctx: commands.Context):
+        """Show AI cache and upstream stats"""
+        stats = response_cache.stats()
+        errors = ", ".join(f"{name}: {count}" for name, count in error_counts.most_common()) or "None"
+        circuits = ", ".join(f"{model.split('/')[-1]}: {b.state}" for model, b in breakers.items()) or "No calls yet"
+        await ctx.send(embed=discord.Embed(
+            title="AI Stats",
+            description=f"**Cache:** {stats['entries']} entries ({stats['bytes']} bytes)\n"
+                        f"Hits: {stats['hits']} • Misses: {stats['misses']} • Stale: {stats['stale_hits']}\n"
+                        f"Hit rate: {stats['hit_rate']:.0%}\n\n"
+                        f"**System prompt:** ~{system_prompt_template.tokens} tokens\n"
+                        f"**Upstream circuits:** {circuits}\n"
+                        f"Errors: {errors}",
+            color=0x5865F2
+        ))
+
+    @bot.hybrid_command(name="aimodel")
+    @commands.has_permissions(manage_channels=True)
+    async def aimodel(ctx: commands.Context, tier: str = "auto"):
+        """Set the AI model tier for this channel"""
+        tier = tier.lower()
+        if tier != "auto" and tier not in TIERS:
+            await ctx.send(embed=discord.Embed(
+                title="Error",
+                description=f"Use `{bot.command_prefix}aimodel <auto|{'|'.join(TIERS)}>`",
+                color=0xCD5C5C
+            ))
+            return
+
+        set_channel_tier(ctx.channel.id, None if tier == "auto" else tier)
+        model = "picked per question" if tier == "auto" else f"`{TIERS[tier]['model']}`"
+        await ctx.send(embed=discord.Embed(
+            title="AI Model Updated",
+            description=f"AI tier for {ctx.channel.mention}: **{tier}** ({model})",
             color=0x9ACD32
         ))
\ No newline at end of file
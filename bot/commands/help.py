@@ -12,6 +12,7 @@ def setup_help(bot):
 
     @bot.command(name="help")
     async def help_command(ctx):
+        """Open the interactive help menu"""
         embed = discord.Embed(
             title="🤖 **__Bot Help Panel__**",
             description=(
@@ -54,15 +55,28 @@ def setup_help(bot):
                     f"**untimeout** - Remove timeout\n`Usage:` `{BOT_PREFIX}untimeout @user`"
                 ), inline=False)
 
+                embed.add_field(name="🚨 Raid Response", value=(
+                    f"**massban** - Ban many users\n`Usage:` `{BOT_PREFIX}massban users: id id @user reason: raid`\n"
+                    f"**masskick** - Kick many users\n`Usage:` `{BOT_PREFIX}masskick role: @role`\n"
+                    f"**masstimeout** - Timeout many users\n`Usage:` `{BOT_PREFIX}masstimeout 1h users: id id`\n"
+                    f"**massaddrole** - Add a role to many users\n`Usage:` `{BOT_PREFIX}massaddrole @role users: id id`\n"
+                    f"**massremoverole** - Remove a role from many users\n`Usage:` `{BOT_PREFIX}massremoverole @role role: @role`\n"
+                    f"**antispam** - Auto spam timeouts / raid lockdowns\n`Usage:` `{BOT_PREFIX}antispam spam/raid on/off`"
+                ), inline=False)
+
                 embed.add_field(name="⚠️ Warnings & Logs", value=(
                     f"**warn** - Warn a user\n`Usage:` `{BOT_PREFIX}warn @user [reason]`\n"
-                    f"**warnings** - Check user warnings\n`Usage:` `{BOT_PREFIX}warnings @user`\n"
-                    f"**clearwarnings** - Clear all warnings\n`Usage:` `{BOT_PREFIX}clearwarnings @user`"
+                    f"**warnings** - Check user warnings\n`Usage:` `{BOT_PREFIX}warnings @user [page]`\n"
+                    f"**clearwarnings** - Clear all warnings\n`Usage:` `{BOT_PREFIX}clearwarnings @user`\n"
+                    f"**logchannel** - Set mod log channel\n`Usage:` `{BOT_PREFIX}logchannel #channel`\n"
+                    f"**automod** - Turn automod on/off or show it\n`Usage:` `{BOT_PREFIX}automod [on/off]`\n"
+                    f"**automodwords** - Banned words\n`Usage:` `{BOT_PREFIX}automodwords add word1, word2`\n"
+                    f"**automodrule** - Change a rule\n`Usage:` `{BOT_PREFIX}automodrule mentions 5`"
                 ), inline=False)
 
                 embed.add_field(name="🧹 Message Management", value=(
-                    f"**purge** - Purge messages\n`Usage:` `{BOT_PREFIX}purge 2`\n"
-                    f"**snipe** - Show last deleted message\n`Usage:` `{BOT_PREFIX}snipe`"
+                    f"**purge** - Purge messages\n`Usage:` `{BOT_PREFIX}purge 50 [user: @user] [bots: yes] [regex: text] [links: yes] [attachments: yes] [after: date] [before: date]`\n"
+                    f"**snipe** - Show a deleted message\n`Usage:` `{BOT_PREFIX}snipe [index]`"
                 ), inline=False)
 
                 embed.add_field(name="🔒 Channel Management", value=(
@@ -71,7 +85,9 @@ def setup_help(bot):
                     f"**slowmode** - Set slowmode\n`Usage:` `{BOT_PREFIX}slowmode #channel 10s/m/h`\n"
                     f"**hide** - Hide a channel\n`Usage:` `{BOT_PREFIX}hide #channel`\n"
                     f"**unhide** - Unhide a channel\n`Usage:` `{BOT_PREFIX}unhide #channel`\n"
-                    f"**nuke** - Nuke a channel\n`Usage:` `{BOT_PREFIX}nuke #channel`"
+                    f"**nuke** - Nuke a channel\n`Usage:` `{BOT_PREFIX}nuke #channel`\n"
+                    f"**lockdown** - Lock the server or a category\n`Usage:` `{BOT_PREFIX}lockdown [category] [hide]`\n"
+                    f"**unlockdown** - Restore channels after a lockdown\n`Usage:` `{BOT_PREFIX}unlockdown`"
                 ), inline=False)
 
                 embed.add_field(name="🎭 Role Management", value=(
@@ -116,9 +132,12 @@ def setup_help(bot):
                 embed.add_field(name="🎉 Fun & Tools", value=(
                     f"**say** - Repeat text\n`Usage:` `{BOT_PREFIX}say Hello`\n"
                     f"**remindme** - Set reminder\n`Usage:` `{BOT_PREFIX}remindme 10m Take a break`\n"
+                    f"**reminders** - Your reminders\n`Usage:` `{BOT_PREFIX}reminders`\n"
+                    f"**cancelreminder** - Cancel reminder\n`Usage:` `{BOT_PREFIX}cancelreminder id`\n"
                     f"**invite** - Bot invite\n`Usage:` `{BOT_PREFIX}invite`\n"
                     f"**support** - Support server\n`Usage:` `{BOT_PREFIX}support`\n"
-                    f"**suggest** - Suggestion for the developer\n`Usage:` `{BOT_PREFIX}suggest`"
+                    f"**suggest** - Suggestion for the developer\n`Usage:` `{BOT_PREFIX}suggest`\n"
+                    f"**suggestchannel** - Set suggestion channel\n`Usage:` `{BOT_PREFIX}suggestchannel #channel`"
                 ), inline=False)
 
             elif value == "ai":
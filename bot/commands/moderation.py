@@ -2,29 +2,244 @@ import discord
 from discord.ext import commands
 import asyncio
 import aiohttp
+import io
 import typing
-from datetime import timedelta
+from datetime import datetime, timedelta, timezone
 import re
+from bot.utils.guild_config import guild_config
+from bot.utils.cases import case_store, CASES_PER_PAGE
+from bot.utils.snipes import snipes
+from bot.utils.logsink import log_sink
+from bot.utils.bulk import run_bulk, parse_ids, BULK_MAX_TARGETS
+from bot.utils.lockdown import lockdown, lift, lockable_channels
+from bot.utils.purge import purge_channel, build_filter, PURGE_MAX_MESSAGES
+from bot.utils.automod import automod, ACTIONS
+from bot.utils.antispam import spam_detector, SPAM_TIMEOUT
 
 intents = discord.Intents.all()  # Needed for moderation bots
 bot = commands.Bot(command_prefix="/", intents=intents)  # Or your own prefix
 
 # --- Global Variables and Configuration ---
-log_channel = None  # Channel ID where moderation actions will be logged
-warnings_db = {}  # In-memory warnings (as a dictionary)
-last_deleted_message = None  # Stores the last deleted message for the snipe command
+# Log channel IDs are stored per guild in guild_config under "log_channel"
+# Warnings and other moderation cases are stored per guild in case_store
+# Deleted messages for the snipe command are kept per channel in snipes
 
 # --- Helper Function for Logging Moderator Actions ---
-async def log_action(bot, action, target, reason, moderator, extra_info=""):
+# Queues the log embed and returns at once; log_sink sends queued embeds in batches
+def log_action(bot, action, target, reason, moderator, extra_info="", file=None):
+    guild = getattr(moderator, "guild", None)
+    log_channel = guild_config.get(guild.id, "log_channel") if guild else None
     if log_channel:
         channel = bot.get_channel(log_channel)
         if channel:
             embed = discord.Embed(
                 title=f"Log: {action}",
-                description=f"Target: {target}\nReason: {reason or 'No reason given'}\nBy: {moderator}\n{extra_info}",
-                color=0x708090
+                description=f"Target: {target}\nReason: {reason or 'No reason given'}\nBy: {moderator}\n{extra_info}"[:4096],
+                color=0x708090,
+                timestamp=discord.utils.utcnow()  # Batched logs arrive a moment after the action
             )
-            await channel.send(embed=embed)
+            log_sink.post(channel, embed, file)
+
+def parse_duration(duration):
+    """Seconds from '30s', '10m', '1h' or a bare number of seconds. Raises ValueError."""
+    if duration.endswith('s'):
+        return int(duration[:-1])
+    elif duration.endswith('m'):
+        return int(duration[:-1]) * 60
+    elif duration.endswith('h'):
+        return int(duration[:-1]) * 3600
+    return int(duration)
+
+# --- Bulk Moderation Helpers ---
+class BulkFlags(commands.FlagConverter):
+    users: typing.Optional[str] = commands.flag(default=None, description="User IDs or mentions")
+    role: typing.Optional[discord.Role] = commands.flag(default=None, description="Everyone with this role")
+    reason: typing.Optional[str] = commands.flag(default=None, description="Reason for the audit log")
+
+def bulk_skip_reason(ctx, target):
+    if target.id in (ctx.author.id, ctx.me.id):
+        return "cannot target yourself or me"
+    if target.id == ctx.guild.owner_id:
+        return "server owner"
+    if isinstance(target, discord.Member) and ctx.author.id != ctx.guild.owner_id and target.top_role >= ctx.author.top_role:
+        return "role is not below yours"
+    return None
+
+def collect_bulk_targets(ctx, flags):
+    """id -> Member, or a bare Object for IDs not in the member cache."""
+    targets = {}
+    if flags.role:
+        targets.update((m.id, m) for m in flags.role.members)
+    for user_id in parse_ids(flags.users):
+        targets.setdefault(user_id, ctx.guild.get_member(user_id) or discord.Object(id=user_id))
+    return targets
+
+async def resolve_bulk_targets(ctx, targets, members_only=True):
+    """Look up uncached IDs so every member gets the hierarchy checks, then return
+    (allowed targets, (target, reason) pairs skipped).
+
+    Users who are not in the server are skipped unless members_only is False
+    (bans), where they stay bare Objects: they have no roles to compare.
+    """
+    missing = [t.id for t in targets.values() if not isinstance(t, discord.Member)]
+    not_found = "not a member"
+    # One gateway request per 100 IDs instead of one HTTP call per user
+    for start in range(0, len(missing), 100):
+        chunk = missing[start:start + 100]
+        try:
+            found = await ctx.guild.query_members(user_ids=chunk, limit=len(chunk), cache=True)
+        except asyncio.TimeoutError:
+            found = []
+            not_found = "could not look up member"
+        targets.update((m.id, m) for m in found)
+
+    allowed, skipped = [], []
+    for target in targets.values():
+        if members_only and not isinstance(target, discord.Member):
+            reason = not_found
+        else:
+            reason = bulk_skip_reason(ctx, target)
+        if reason:
+            skipped.append((target, reason))
+        else:
+            allowed.append(target)
+    return allowed, skipped
+
+async def as_member(guild, target):
+    if isinstance(target, discord.Member):
+        return target
+    return guild.get_member(target.id) or await guild.fetch_member(target.id)
+
+async def run_bulk_command(ctx, flags, verb, action, run=None, members_only=True):
+    """Resolve targets, run `action` on each with a live status message and return
+    (succeeded, failed), or None when there was nothing to do."""
+    targets = collect_bulk_targets(ctx, flags)
+    if len(targets) > BULK_MAX_TARGETS:
+        await ctx.send(f"❌ **Error:** Too many targets ({len(targets)}). The limit is {BULK_MAX_TARGETS}.")
+        return None
+    targets, failed = await resolve_bulk_targets(ctx, targets, members_only)
+    if not targets:
+        await ctx.send("❌ **Error:** No valid targets. Give `users:` with IDs or mentions of members, or a `role:`.")
+        return None
+
+    status = await ctx.send(f"⏳ **{verb}:** 0/{len(targets)} done...")
+
+    async def progress(done, total):
+        await status.edit(content=f"⏳ **{verb}:** {done}/{total} done...")
+
+    succeeded, errors = await (run or run_bulk)(targets, action, progress)
+    failed += errors
+    summary = f"✅ **{verb} finished:** {len(succeeded)} succeeded, {len(failed)} failed."
+    if failed:
+        lines = [f"- `{target.id}`: {error}" for target, error in failed[:10]]
+        if len(failed) > 10:
+            lines.append(f"+{len(failed) - 10} more")
+        summary += "\n" + "\n".join(lines)
+    await status.edit(content=summary[:2000])
+    return succeeded, failed
+
+def bulk_log_info(succeeded, failed):
+    ids = " ".join(str(t.id) for t in succeeded)
+    return f"Failed: {len(failed)}\nIDs: {ids}"
+
+def bulk_ban_chunks(guild, reason):
+    """A run_bulk replacement for bans: Discord's bulk ban endpoint takes 200 users per request."""
+    async def run(targets, _action, on_progress):
+        succeeded, failed = [], []
+        for start in range(0, len(targets), 200):
+            chunk = targets[start:start + 200]
+            try:
+                # Also clears the last day of their messages, which is usually the raid spam
+                result = await guild.bulk_ban(chunk, reason=reason, delete_message_seconds=86400)
+                banned = {user.id for user in result.banned}
+                succeeded += [t for t in chunk if t.id in banned]
+                failed += [(t, "could not ban") for t in chunk if t.id not in banned]
+            except discord.HTTPException as e:
+                failed += [(t, str(e)) for t in chunk]
+            if start + 200 < len(targets):
+                await on_progress(len(succeeded) + len(failed), len(targets))
+        return succeeded, failed
+    return run
+
+# --- Purge Helpers ---
+class PurgeFlags(commands.FlagConverter):
+    user: typing.Optional[discord.User] = commands.flag(default=None, description="Only messages from this user")
+    bots: bool = commands.flag(default=False, description="Only messages from bots")
+    regex: typing.Optional[str] = commands.flag(default=None, description="Only messages matching this pattern")
+    links: bool = commands.flag(default=False, description="Only messages with links")
+    attachments: bool = commands.flag(default=False, description="Only messages with attachments")
+    after: typing.Optional[str] = commands.flag(default=None, description="Only after this date (YYYY-MM-DD) or message ID")
+    before: typing.Optional[str] = commands.flag(default=None, description="Only before this date (YYYY-MM-DD) or message ID")
+
+def parse_when(value):
+    """A message ID or ISO date (UTC) as something channel.history accepts. Raises ValueError."""
+    if value is None:
+        return None
+    if value.isdigit() and len(value) >= 15:
+        return discord.Object(id=int(value))
+    when = datetime.fromisoformat(value)
+    return when if when.tzinfo else when.replace(tzinfo=timezone.utc)
+
+# --- Automod ---
+async def run_automod(bot, message):
+    """Check a guild message against its automod rules and act on a hit.
+    Returns True when the message broke a rule and was handled."""
+    if message.guild is None or not isinstance(message.author, discord.Member):
+        return False
+    hit = automod.check(message)
+    # Staff are exempt; checked only on a hit since permissions are the slow part
+    if hit is None or message.author.guild_permissions.manage_messages:
+        return False
+    rules, reason = hit
+    member = message.author
+    action = "Deleted"
+    try:
+        await message.delete()
+        if rules.action == "warn":
+            case_store.add(message.guild.id, member.id, bot.user.id, "warn", f"Automod: {reason}")
+            action = "Deleted and warned"
+        elif rules.action == "timeout":
+            await member.timeout(discord.utils.utcnow() + timedelta(seconds=parse_duration(rules.timeout)), reason=f"Automod: {reason}")
+            case_store.add(message.guild.id, member.id, bot.user.id, "timeout", rules.timeout)
+            action = f"Deleted and timed out for {rules.timeout}"
+        await message.channel.send(f"⚠️ {member.mention}, your message was removed. **Reason:** {reason}.", delete_after=5)
+    except discord.HTTPException as e:
+        print(f"Automod Action Error: {e}")
+    log_action(bot, "Automod", member.display_name, reason, message.guild.me, f"Channel: #{message.channel.name}\nAction: {action}")
+    return True
+
+# --- Spam and Raid Detection ---
+# Enabled per guild in guild_config under "antispam": {"spam": bool, "raid": bool}
+async def run_antispam(bot, message):
+    """Feed a guild message to the spam detector and time out a flooding member.
+    Returns True when the message was handled as spam."""
+    if not guild_config.get(message.guild.id, "antispam", {}).get("spam"):
+        return False
+    reason = spam_detector.message(message.guild.id, message.author.id, message.content)
+    if reason is None or not isinstance(message.author, discord.Member) or message.author.guild_permissions.manage_messages:
+        return False
+    member = message.author
+    spam_detector.reset(message.guild.id, member.id)
+    try:
+        await member.timeout(discord.utils.utcnow() + timedelta(seconds=SPAM_TIMEOUT), reason=f"Anti-spam: {reason}")
+        case_store.add(message.guild.id, member.id, bot.user.id, "timeout", f"{SPAM_TIMEOUT}s")
+        await message.delete()
+        await message.channel.send(f"🚫 {member.mention} was timed out for spamming. **Reason:** {reason}.", delete_after=10)
+    except discord.HTTPException as e:
+        print(f"Anti-spam Action Error: {e}")
+    log_action(bot, "Anti-spam Timeout", member.display_name, reason, message.guild.me, f"Channel: #{message.channel.name}\nDuration: {SPAM_TIMEOUT}s")
+    return True
+
+async def handle_raid(bot, guild, raiders):
+    """Lock the guild down after a join raid and log the joiners for a follow-up massban."""
+    result = await lockdown(guild, lockable_channels(guild), "Anti-raid: join flood")
+    if result is None:
+        return  # Already locked down
+    locked, failed = result
+    log_action(
+        bot, "Anti-raid Lockdown", guild.name, f"{len(raiders)} joins in a short time", guild.me,
+        f"Channels locked: {len(locked)}\nFailed: {len(failed)}\nUse `unlockdown` to lift, `massban` for the joiners.\nJoiners: {' '.join(map(str, raiders))}"
+    )
 
 def setup_moderation(bot):
     # --- Moderation Commands ---
@@ -32,10 +247,12 @@ def setup_moderation(bot):
     @bot.hybrid_command(name="kick")
     @commands.has_permissions(kick_members=True)
     async def kick(ctx, member: discord.Member, *, reason: str = None):
+        """Kick a member from the server"""
         try:
             await member.kick(reason=reason)
+            case_store.add(ctx.guild.id, member.id, ctx.author.id, "kick", reason)
             await ctx.send(f"✅ **Success:** {member.display_name} has been kicked.\n**Reason:** {reason or 'No reason given'}.")
-            await log_action(bot, "Kick", member.display_name, reason, ctx.author)
+            log_action(bot, "Kick", member.display_name, reason, ctx.author)
         except discord.Forbidden:
             await ctx.send("❌ **Error:** I do not have permission to kick this user. Please check my permissions.")
         except Exception as e:
@@ -44,10 +261,12 @@ def setup_moderation(bot):
     @bot.hybrid_command(name="ban")
     @commands.has_permissions(ban_members=True)
     async def ban(ctx, member: discord.Member, *, reason: str = None):
+        """Ban a member from the server"""
         try:
             await member.ban(reason=reason)
+            case_store.add(ctx.guild.id, member.id, ctx.author.id, "ban", reason)
             await ctx.send(f"✅ **Success:** {member.display_name} has been banned.\n**Reason:** {reason or 'No reason given'}.")
-            await log_action(bot, "Ban", member.display_name, reason, ctx.author)
+            log_action(bot, "Ban", member.display_name, reason, ctx.author)
         except discord.Forbidden:
             await ctx.send("❌ **Error:** I do not have permission to ban this user. Please check my permissions.")
         except Exception as e:
@@ -56,6 +275,7 @@ def setup_moderation(bot):
     @bot.hybrid_command(name="unban")
     @commands.has_permissions(ban_members=True)
     async def unban(ctx, *, user: str):
+        """Unban a user by name or name#discriminator"""
         try:
             banned_users = await ctx.guild.bans()
             name, discriminator = (user.split("#") if "#" in user else (user, None))
@@ -63,8 +283,9 @@ def setup_moderation(bot):
             for ban_entry in banned_users:
                 if ban_entry.user.name == name and (discriminator is None or ban_entry.user.discriminator == discriminator):
                     await ctx.guild.unban(ban_entry.user)
+                    case_store.add(ctx.guild.id, ban_entry.user.id, ctx.author.id, "unban", "Manual Unban")
                     await ctx.send(f"✅ **Success:** {user} was unbanned and can join again.")
-                    await log_action(bot, "Unban", user, "Manual Unban", ctx.author)
+                    log_action(bot, "Unban", user, "Manual Unban", ctx.author)
                     return
             await ctx.send("❌ **Error:** User not found in ban list or format is incorrect. Use `name#discriminator` or just name.")
         except Exception as e:
@@ -73,19 +294,13 @@ def setup_moderation(bot):
     @bot.hybrid_command(name="timeout")
     @commands.has_permissions(moderate_members=True)
     async def timeout(ctx, member: discord.Member, duration: str):
+        """Timeout a member (e.g. 30s, 10m, 1h)"""
         try:
-            seconds = 0
-            if duration.endswith('s'):
-                seconds = int(duration[:-1])
-            elif duration.endswith('m'):
-                seconds = int(duration[:-1]) * 60
-            elif duration.endswith('h'):
-                seconds = int(duration[:-1]) * 3600
-            else:
-                seconds = int(duration)
+            seconds = parse_duration(duration)
             await member.timeout(discord.utils.utcnow() + timedelta(seconds=seconds))
+            case_store.add(ctx.guild.id, member.id, ctx.author.id, "timeout", duration)
             await ctx.send(f"✅ **Success:** {member.display_name} is timed out for {duration}. They cannot send messages now.")
-            await log_action(bot, "Timeout", member.display_name, duration, ctx.author)
+            log_action(bot, "Timeout", member.display_name, duration, ctx.author)
         except ValueError:
             await ctx.send("❌ **Error:** Invalid duration format. Use like `30s` (seconds), `5m` (minutes), or `1h` (hours).")
         except discord.Forbidden:
@@ -96,10 +311,12 @@ def setup_moderation(bot):
     @bot.hybrid_command(name="untimeout")
     @commands.has_permissions(moderate_members=True)
     async def untimeout(ctx, member: discord.Member):
+        """Remove a member's timeout"""
         try:
             await member.timeout(None)
+            case_store.add(ctx.guild.id, member.id, ctx.author.id, "untimeout", "Timeout removed")
             await ctx.send(f"✅ **Success:** Timeout removed from {member.display_name}. They can talk again.")
-            await log_action(bot, "Untimeout", member.display_name, "Timeout removed", ctx.author)
+            log_action(bot, "Untimeout", member.display_name, "Timeout removed", ctx.author)
         except discord.Forbidden:
             await ctx.send("❌ **Error:** I do not have permission to remove timeout from this member.")
         except Exception as e:
@@ -108,28 +325,32 @@ def setup_moderation(bot):
     @bot.hybrid_command(name="warn")
     @commands.has_permissions(manage_messages=True)
     async def warn(ctx, member: discord.Member, *, reason: str = "No reason given"):
+        """Warn a member"""
         try:
-            if member.id not in warnings_db:
-                warnings_db[member.id] = []
-            warnings_db[member.id].append(reason)
-            await ctx.send(f"⚠️ **Warning:** {member.display_name} has been warned.\n**Reason:** {reason}.")
-            await log_action(bot, "Warn", member.display_name, reason, ctx.author)
+            case = case_store.add(ctx.guild.id, member.id, ctx.author.id, "warn", reason)
+            await ctx.send(f"⚠️ **Warning:** {member.display_name} has been warned (case #{case.id}).\n**Reason:** {reason}.")
+            log_action(bot, "Warn", member.display_name, reason, ctx.author)
         except Exception as e:
             await ctx.send(f"⚠️ **Error:** Warning failed. Error: {e}")
 
     @bot.hybrid_command(name="warnings")
-    async def warnings(ctx, member: discord.Member):
+    async def warnings(ctx, member: discord.Member, page: int = 1):
+        """Show a member's warnings, newest first"""
         try:
-            warns = warnings_db.get(member.id, [])
-            if not warns:
+            warns, total = await case_store.history(ctx.guild.id, member.id, "warn", page=max(page, 1) - 1)
+            if not total:
                 await ctx.send(f"✅ **Info:** No warnings for {member.display_name}.")
+            elif not warns:
+                await ctx.send(f"❌ **Error:** There is no page {page}. {member.display_name} has {total} warning(s).")
             else:
-                warn_list = "\n".join([f"- {w}" for w in warns])
+                warn_list = "\n".join(f"- #{w.id} <t:{int(w.created_at)}:d> {w.reason}" for w in warns)
+                pages = (total + CASES_PER_PAGE - 1) // CASES_PER_PAGE
                 embed = discord.Embed(
                     title=f"Warnings for {member.display_name}",
                     description=warn_list,
                     color=discord.Color.orange()
                 )
+                embed.set_footer(text=f"Page {max(page, 1)}/{pages} • {total} warning(s)")
                 await ctx.send(embed=embed)
         except Exception as e:
             await ctx.send(f"⚠️ **Error:** Could not check warnings. Error: {e}")
@@ -137,11 +358,11 @@ def setup_moderation(bot):
     @bot.hybrid_command(name="clearwarnings")
     @commands.has_permissions(manage_messages=True)
     async def clearwarnings(ctx, member: discord.Member):
+        """Clear all warnings of a member"""
         try:
-            if member.id in warnings_db:
-                warnings_db.pop(member.id)
+            if await case_store.clear(ctx.guild.id, member.id, "warn"):
                 await ctx.send(f"🗑️ **Success:** All warnings cleared for {member.display_name}.")
-                await log_action(bot, "Clear Warnings", member.display_name, "All warnings cleared", ctx.author)
+                log_action(bot, "Clear Warnings", member.display_name, "All warnings cleared", ctx.author)
             else:
                 await ctx.send(f"✅ **Info:** No warnings found for {member.display_name} to clear.")
         except Exception as e:
@@ -149,35 +370,63 @@ def setup_moderation(bot):
 
     @bot.hybrid_command(name="purge")
     @commands.has_permissions(manage_messages=True)
-    async def purge(ctx, amount: int):
-        if amount <= 0 or amount > 1000:
-            return await ctx.send("❌ **Error:** Amount must be between 1 and 1000.")
+    async def purge(ctx, amount: int, *, flags: PurgeFlags):
+        """Delete recent messages in this channel, optionally filtered"""
+        if amount <= 0 or amount > PURGE_MAX_MESSAGES:
+            return await ctx.send(f"❌ **Error:** Amount must be between 1 and {PURGE_MAX_MESSAGES}.")
         try:
-            deleted_messages = await ctx.channel.purge(limit=amount + 1)
-            msg = await ctx.send(f"🧹 **Success:** {len(deleted_messages) - 1} messages were removed by {ctx.author.display_name}.")
+            after, before = parse_when(flags.after), parse_when(flags.before)
+            if flags.regex and len(flags.regex) > 200:
+                return await ctx.send("❌ **Error:** The regex is too long (max 200 characters).")
+            status = await ctx.send(f"⏳ **Purge:** scanning for up to {amount} messages...")
+            check = build_filter(flags.user, flags.bots, flags.regex, flags.links, flags.attachments, skip_ids=(ctx.message.id, status.id))
+
+            async def progress(scanned, deleted):
+                await status.edit(content=f"⏳ **Purge:** {deleted} deleted, {scanned} scanned...")
+
+            deleted, failed, scanned = await purge_channel(ctx.channel, amount, check, before, after, progress)
+            if ctx.interaction is None:
+                try:
+                    await ctx.message.delete()
+                except discord.HTTPException:
+                    pass
+            summary = f"🧹 **Success:** {len(deleted)} messages were removed by {ctx.author.display_name} ({scanned} scanned)."
+            if failed:
+                summary += f"\n❌ {failed} could not be deleted."
+            await status.edit(content=summary)
+            # Every deleted ID goes in an attached file; thousands would not fit in the embed
+            ids = discord.File(io.BytesIO("\n".join(map(str, deleted)).encode()), filename=f"purge-{ctx.channel.id}.txt")
+            log_action(bot, "Purge", f"#{ctx.channel.name}", f"{len(deleted)} messages", ctx.author, f"Scanned: {scanned}\nFailed: {failed}\nDeleted IDs: attached", ids)
             await asyncio.sleep(3)
-            await msg.delete()
+            await status.delete()
+        except ValueError:
+            await ctx.send("❌ **Error:** Invalid date. Use `YYYY-MM-DD`, `YYYY-MM-DD HH:MM` or a message ID.")
+        except re.error as e:
+            await ctx.send(f"❌ **Error:** That regex is not allowed: {e.msg}.")
         except discord.Forbidden:
             await ctx.send("❌ **Error:** I do not have permission to remove messages.")
         except Exception as e:
             await ctx.send(f"⚠️ **Error:** Could not remove messages. Error: {e}")
 
     @bot.hybrid_command(name="snipe")
-    async def snipe(ctx):
-        global last_deleted_message
+    async def snipe(ctx, index: int = 1):
+        """Show a recently deleted message in this channel (1 = latest)"""
         try:
-            if last_deleted_message:
+            sniped, count = snipes.get(ctx.channel.id, index)
+            if sniped:
                 embed = discord.Embed(
                     title="Sniped Message",
-                    description=last_deleted_message.content,
+                    description=sniped.content or None,
                     color=discord.Color.blue()
                 )
-                embed.set_author(
-                    name=last_deleted_message.author.display_name,
-                    icon_url=last_deleted_message.author.avatar.url if last_deleted_message.author.avatar else None
-                )
-                embed.set_footer(text=f"Channel: #{last_deleted_message.channel.name}")
+                embed.set_author(name=sniped.author_name, icon_url=sniped.author_avatar)
+                if sniped.attachments:
+                    embed.add_field(name="📎 Attachments", value="\n".join(sniped.attachments)[:1024], inline=False)
+                embed.set_footer(text=f"Channel: #{sniped.channel_name} • {index}/{count}")
+                embed.timestamp = datetime.fromtimestamp(sniped.deleted_at, timezone.utc)
                 await ctx.send(embed=embed)
+            elif count:
+                await ctx.send(f"❌ **Error:** Only {count} deleted message(s) can be sniped here. Pick 1 to {count}.")
             else:
                 await ctx.send("ℹ️ **Info:** No recently deleted message to snipe.")
         except Exception as e:
@@ -185,16 +434,20 @@ def setup_moderation(bot):
 
     @bot.event
     async def on_message_delete(message):
-        global last_deleted_message
-        last_deleted_message = message
+        snipes.add(message)
+
+    @bot.event
+    async def on_bulk_message_delete(messages):
+        snipes.add_many(messages)
 
     @bot.hybrid_command(name="lock")
     @commands.has_permissions(manage_channels=True)
     async def lock(ctx):
+        """Lock this channel for @everyone"""
         try:
             await ctx.channel.set_permissions(ctx.guild.default_role, send_messages=False)
             await ctx.send("🔒 **Success:** Channel is now locked. Only staff can send messages here.")
-            await log_action(bot, "Lock Channel", ctx.channel.name, "Channel locked", ctx.author)
+            log_action(bot, "Lock Channel", ctx.channel.name, "Channel locked", ctx.author)
         except discord.Forbidden:
             await ctx.send("❌ **Error:** I do not have permission to lock this channel.")
         except Exception as e:
@@ -203,10 +456,11 @@ def setup_moderation(bot):
     @bot.hybrid_command(name="unlock")
     @commands.has_permissions(manage_channels=True)
     async def unlock(ctx):
+        """Unlock this channel for @everyone"""
         try:
             await ctx.channel.set_permissions(ctx.guild.default_role, send_messages=True)
             await ctx.send("🔓 **Success:** Channel is now unlocked. Everyone can send messages.")
-            await log_action(bot, "Unlock Channel", ctx.channel.name, "Channel unlocked", ctx.author)
+            log_action(bot, "Unlock Channel", ctx.channel.name, "Channel unlocked", ctx.author)
         except discord.Forbidden:
             await ctx.send("❌ **Error:** I do not have permission to unlock this channel.")
         except Exception as e:
@@ -215,12 +469,13 @@ def setup_moderation(bot):
     @bot.hybrid_command(name="slowmode")
     @commands.has_permissions(manage_channels=True)
     async def slowmode(ctx, seconds: int):
+        """Set slowmode for this channel in seconds"""
         if seconds < 0 or seconds > 21600:
             return await ctx.send("❌ **Error:** Slowmode must be between 0 and 21600 seconds (6 hours).")
         try:
             await ctx.channel.edit(slowmode_delay=seconds)
             await ctx.send(f"🐢 **Success:** Slowmode set to {seconds} seconds in this channel.")
-            await log_action(bot, "Slowmode", ctx.channel.name, f"{seconds} seconds", ctx.author)
+            log_action(bot, "Slowmode", ctx.channel.name, f"{seconds} seconds", ctx.author)
         except discord.Forbidden:
             await ctx.send("❌ **Error:** I do not have permission to set slowmode here.")
         except Exception as e:
@@ -229,10 +484,11 @@ def setup_moderation(bot):
     @bot.hybrid_command(name="hide")
     @commands.has_permissions(manage_channels=True)
     async def hide(ctx):
+        """Hide this channel from @everyone"""
         try:
             await ctx.channel.set_permissions(ctx.guild.default_role, view_channel=False)
             await ctx.send("👀 **Success:** Channel is now hidden. Only staff can see it.")
-            await log_action(bot, "Hide Channel", ctx.channel.name, "Hidden from @everyone", ctx.author)
+            log_action(bot, "Hide Channel", ctx.channel.name, "Hidden from @everyone", ctx.author)
         except discord.Forbidden:
             await ctx.send("❌ **Error:** I do not have permission to hide this channel.")
         except Exception as e:
@@ -241,18 +497,68 @@ def setup_moderation(bot):
     @bot.hybrid_command(name="unhide")
     @commands.has_permissions(manage_channels=True)
     async def unhide(ctx):
+        """Make this channel visible to @everyone"""
         try:
             await ctx.channel.set_permissions(ctx.guild.default_role, view_channel=True)
             await ctx.send("👁️ **Success:** Channel is now visible to everyone.")
-            await log_action(bot, "Unhide Channel", ctx.channel.name, "Visible to @everyone", ctx.author)
+            log_action(bot, "Unhide Channel", ctx.channel.name, "Visible to @everyone", ctx.author)
         except discord.Forbidden:
             await ctx.send("❌ **Error:** I do not have permission to unhide this channel.")
         except Exception as e:
             await ctx.send(f"⚠️ **Error:** Could not unhide the channel. Error: {e}")
 
+    @bot.hybrid_command(name="lockdown")
+    @commands.has_permissions(manage_channels=True)
+    async def lockdown_command(ctx, category: typing.Optional[discord.CategoryChannel] = None, hide: typing.Optional[typing.Literal["hide"]] = None):
+        """Lock every channel in the server or one category for @everyone"""
+        try:
+            scope = f"category {category.name}" if category else "the server"
+            status = await ctx.send(f"⏳ **Lockdown:** locking {scope}...")
+
+            async def progress(done, total):
+                await status.edit(content=f"⏳ **Lockdown:** {done}/{total} channels locked...")
+
+            hide = hide is not None
+            result = await lockdown(ctx.guild, lockable_channels(ctx.guild, category), f"Lockdown by {ctx.author}", hide, progress)
+            if result is None:
+                return await status.edit(content="❌ **Error:** A lockdown is already active. Use `unlockdown` first.")
+            locked, failed = result
+            if not locked and not failed:
+                return await status.edit(content=f"ℹ️ **Info:** Every channel in {scope} is already locked.")
+            summary = f"🔒 **Success:** Locked {len(locked)} channel(s) in {scope}. Use `unlockdown` to restore them."
+            if failed:
+                summary += f"\n❌ Could not lock {len(failed)}: " + ", ".join(f"#{c.name}" for c, _ in failed[:10])
+            await status.edit(content=summary[:2000])
+            log_action(bot, "Lockdown", scope, "Hidden and locked" if hide else "Locked", ctx.author, f"Channels: {len(locked)}\nFailed: {len(failed)}")
+        except Exception as e:
+            await ctx.send(f"⚠️ **Error:** Could not lock down. Error: {e}")
+
+    @bot.hybrid_command(name="unlockdown")
+    @commands.has_permissions(manage_channels=True)
+    async def unlockdown(ctx):
+        """Lift the active lockdown and restore every channel's old permissions"""
+        try:
+            status = await ctx.send("⏳ **Unlockdown:** restoring channels...")
+
+            async def progress(done, total):
+                await status.edit(content=f"⏳ **Unlockdown:** {done}/{total} channels restored...")
+
+            result = await lift(ctx.guild, f"Lockdown lifted by {ctx.author}", progress)
+            if result is None:
+                return await status.edit(content="ℹ️ **Info:** There is no active lockdown.")
+            restored, failed = result
+            summary = f"🔓 **Success:** Restored {len(restored)} channel(s) to their permissions before the lockdown."
+            if failed:
+                summary += f"\n❌ Could not restore {len(failed)}; run `unlockdown` again: " + ", ".join(f"#{c.name}" for c, _ in failed[:10])
+            await status.edit(content=summary[:2000])
+            log_action(bot, "Unlockdown", ctx.guild.name, "Lockdown lifted", ctx.author, f"Channels: {len(restored)}\nFailed: {len(failed)}")
+        except Exception as e:
+            await ctx.send(f"⚠️ **Error:** Could not lift the lockdown. Error: {e}")
+
     @bot.hybrid_command(name="nuke")
     @commands.has_permissions(manage_channels=True)
     async def nuke(ctx):
+        """Recreate this channel, deleting all messages"""
         try:
             confirm = await ctx.send("⚠️ Are you sure you want to nuke this channel? React with ✅ to confirm.")
             await confirm.add_reaction("✅")
@@ -269,7 +575,7 @@ def setup_moderation(bot):
             embed = discord.Embed(description=f"💥 **Success:** Channel nuked by {user_mention}! All messages are gone.")
             embed.set_image(url="https://media.tenor.com/SChKroGIZO8AAAAC/explosion-mushroom-cloud.gif")
             await new_channel.send(embed=embed)
-            await log_action(bot, "Channel Nuke", new_channel.name, "Channel recreated", ctx.author)
+            log_action(bot, "Channel Nuke", new_channel.name, "Channel recreated", ctx.author)
 
         except asyncio.TimeoutError:
             await ctx.send("❌ **Error:** Nuke cancelled. You did not confirm in time.")
@@ -281,10 +587,12 @@ def setup_moderation(bot):
     @bot.hybrid_command(name="addrole")
     @commands.has_permissions(manage_roles=True)
     async def addrole(ctx, member: discord.Member, role: discord.Role):
+        """Add a role to a member"""
         try:
             await member.add_roles(role)
+            case_store.add(ctx.guild.id, member.id, ctx.author.id, "add_role", role.name)
             await ctx.send(f"🎭 **Success:** Added `{role.name}` to {member.display_name}.")
-            await log_action(bot, "Add Role", member.display_name, role.name, ctx.author)
+            log_action(bot, "Add Role", member.display_name, role.name, ctx.author)
         except discord.Forbidden:
             await ctx.send("❌ **Error:** I do not have permission to add that role.")
         except Exception as e:
@@ -293,15 +601,209 @@ def setup_moderation(bot):
     @bot.hybrid_command(name="removerole")
     @commands.has_permissions(manage_roles=True)
     async def removerole(ctx, member: discord.Member, role: discord.Role):
+        """Remove a role from a member"""
         try:
             await member.remove_roles(role)
+            case_store.add(ctx.guild.id, member.id, ctx.author.id, "remove_role", role.name)
             await ctx.send(f"🎭 **Success:** Removed `{role.name}` from {member.display_name}.")
-            await log_action(bot, "Remove Role", member.display_name, role.name, ctx.author)
+            log_action(bot, "Remove Role", member.display_name, role.name, ctx.author)
         except discord.Forbidden:
             await ctx.send("❌ **Error:** I do not have permission to remove that role.")
         except Exception as e:
             await ctx.send(f"⚠️ **Error:** Could not remove role. Error: {e}")
 
+    @bot.hybrid_command(name="massban")
+    @commands.has_permissions(ban_members=True)
+    async def massban(ctx, *, flags: BulkFlags):
+        """Ban many users at once by IDs, mentions or role"""
+        try:
+            reason = flags.reason or f"Mass ban by {ctx.author}"
+            result = await run_bulk_command(ctx, flags, "Mass ban", None, run=bulk_ban_chunks(ctx.guild, reason), members_only=False)
+            if result:
+                succeeded, failed = result
+                for target in succeeded:
+                    case_store.add(ctx.guild.id, target.id, ctx.author.id, "ban", reason)
+                log_action(bot, "Mass Ban", f"{len(succeeded)} users", reason, ctx.author, bulk_log_info(succeeded, failed))
+        except Exception as e:
+            await ctx.send(f"⚠️ **Error:** Mass ban failed. Error: {e}")
+
+    @bot.hybrid_command(name="masskick")
+    @commands.has_permissions(kick_members=True)
+    async def masskick(ctx, *, flags: BulkFlags):
+        """Kick many members at once by IDs, mentions or role"""
+        try:
+            reason = flags.reason or f"Mass kick by {ctx.author}"
+            result = await run_bulk_command(ctx, flags, "Mass kick", lambda t: ctx.guild.kick(t, reason=reason))
+            if result:
+                succeeded, failed = result
+                for target in succeeded:
+                    case_store.add(ctx.guild.id, target.id, ctx.author.id, "kick", reason)
+                log_action(bot, "Mass Kick", f"{len(succeeded)} users", reason, ctx.author, bulk_log_info(succeeded, failed))
+        except Exception as e:
+            await ctx.send(f"⚠️ **Error:** Mass kick failed. Error: {e}")
+
+    @bot.hybrid_command(name="masstimeout")
+    @commands.has_permissions(moderate_members=True)
+    async def masstimeout(ctx, duration: str, *, flags: BulkFlags):
+        """Timeout many members at once (e.g. 10m) by IDs, mentions or role"""
+        try:
+            until = discord.utils.utcnow() + timedelta(seconds=parse_duration(duration))
+            reason = flags.reason or f"Mass timeout by {ctx.author}"
+
+            async def action(target):
+                member = await as_member(ctx.guild, target)
+                await member.timeout(until, reason=reason)
+
+            result = await run_bulk_command(ctx, flags, "Mass timeout", action)
+            if result:
+                succeeded, failed = result
+                for target in succeeded:
+                    case_store.add(ctx.guild.id, target.id, ctx.author.id, "timeout", duration)
+                log_action(bot, "Mass Timeout", f"{len(succeeded)} users", reason, ctx.author, f"Duration: {duration}\n" + bulk_log_info(succeeded, failed))
+        except ValueError:
+            await ctx.send("❌ **Error:** Invalid duration format. Use like `30s` (seconds), `5m` (minutes), or `1h` (hours).")
+        except Exception as e:
+            await ctx.send(f"⚠️ **Error:** Mass timeout failed. Error: {e}")
+
+    @bot.hybrid_command(name="massaddrole")
+    @commands.has_permissions(manage_roles=True)
+    async def massaddrole(ctx, new_role: discord.Role, *, flags: BulkFlags):
+        """Add a role to many members at once by IDs, mentions or role"""
+        await mass_role_change(ctx, new_role, flags, add=True)
+
+    @bot.hybrid_command(name="massremoverole")
+    @commands.has_permissions(manage_roles=True)
+    async def massremoverole(ctx, old_role: discord.Role, *, flags: BulkFlags):
+        """Remove a role from many members at once by IDs, mentions or role"""
+        await mass_role_change(ctx, old_role, flags, add=False)
+
+    async def mass_role_change(ctx, role, flags, add):
+        verb = "Mass add role" if add else "Mass remove role"
+        try:
+            if ctx.author.id != ctx.guild.owner_id and role >= ctx.author.top_role:
+                return await ctx.send("❌ **Error:** You can only manage roles below your highest role.")
+            reason = flags.reason or f"{verb} by {ctx.author}"
+
+            async def action(target):
+                member = await as_member(ctx.guild, target)
+                if add:
+                    await member.add_roles(role, reason=reason)
+                else:
+                    await member.remove_roles(role, reason=reason)
+
+            result = await run_bulk_command(ctx, flags, verb, action)
+            if result:
+                succeeded, failed = result
+                for target in succeeded:
+                    case_store.add(ctx.guild.id, target.id, ctx.author.id, "add_role" if add else "remove_role", role.name)
+                log_action(bot, verb.title(), f"{len(succeeded)} users", role.name, ctx.author, bulk_log_info(succeeded, failed))
+        except Exception as e:
+            await ctx.send(f"⚠️ **Error:** {verb} failed. Error: {e}")
+
+    @bot.hybrid_command(name="automod")
+    @commands.has_permissions(manage_guild=True)
+    async def automod_command(ctx, enabled: typing.Optional[bool] = None):
+        """Turn automod on or off, or show its settings"""
+        try:
+            settings = automod.settings(ctx.guild.id)
+            if enabled is not None:
+                settings["enabled"] = enabled
+                guild_config.set(ctx.guild.id, "automod", settings)
+                return await ctx.send(f"🛡️ **Success:** Automod is now {'on' if enabled else 'off'}.")
+            embed = discord.Embed(title="🛡️ Automod Settings", color=discord.Color.red())
+            embed.add_field(name="Status", value="On" if settings["enabled"] else "Off", inline=True)
+            embed.add_field(name="Action", value=f"{settings['action']} ({settings['timeout']})" if settings["action"] == "timeout" else settings["action"], inline=True)
+            embed.add_field(name="Banned Words", value=str(len(settings["words"])), inline=True)
+            embed.add_field(name="Invites", value="Blocked" if settings["invites"] else "Allowed", inline=True)
+            embed.add_field(name="Links", value="Blocked" if settings["links"] else "Allowed", inline=True)
+            embed.add_field(name="Max Mentions", value=settings["max_mentions"] or "Off", inline=True)
+            embed.add_field(name="Max Caps", value=f"{settings['caps_percent']}%" if settings["caps_percent"] else "Off", inline=True)
+            embed.set_footer(text="Change with automodrule and automodwords")
+            await ctx.send(embed=embed)
+        except Exception as e:
+            await ctx.send(f"⚠️ **Error:** Could not update automod. Error: {e}")
+
+    @bot.hybrid_command(name="automodwords")
+    @commands.has_permissions(manage_guild=True)
+    async def automodwords(ctx, mode: typing.Literal["add", "remove", "list"], *, words: str = ""):
+        """Add, remove or list automod banned words (comma separated)"""
+        try:
+            settings = automod.settings(ctx.guild.id)
+            if mode == "list":
+                listed = ", ".join(f"||{w}||" for w in settings["words"]) or "None"
+                return await ctx.send(f"🛡️ **Banned words ({len(settings['words'])}):** {listed}"[:2000])
+            given = [w.strip().lower() for w in words.split(",") if w.strip()]
+            if not given:
+                return await ctx.send("❌ **Error:** Give one or more words, separated by commas.")
+            if mode == "add":
+                settings["words"] = list(dict.fromkeys(settings["words"] + given))
+            else:
+                settings["words"] = [w for w in settings["words"] if w not in given]
+            guild_config.set(ctx.guild.id, "automod", settings)
+            await ctx.send(f"🛡️ **Success:** {len(settings['words'])} banned word(s) now.")
+        except Exception as e:
+            await ctx.send(f"⚠️ **Error:** Could not update banned words. Error: {e}")
+
+    @bot.hybrid_command(name="automodrule")
+    @commands.has_permissions(manage_guild=True)
+    async def automodrule(ctx, rule: typing.Literal["invites", "links", "mentions", "caps", "action", "timeout"], value: str):
+        """Change an automod rule (invites/links on|off, mentions/caps number, action, timeout)"""
+        try:
+            settings = automod.settings(ctx.guild.id)
+            if rule in ("invites", "links"):
+                settings[rule] = value.lower() in ("on", "yes", "true", "1")
+            elif rule == "mentions":
+                settings["max_mentions"] = max(int(value), 0)
+            elif rule == "caps":
+                settings["caps_percent"] = min(max(int(value), 0), 100)
+            elif rule == "action":
+                if value not in ACTIONS:
+                    return await ctx.send(f"❌ **Error:** Action must be one of: {', '.join(ACTIONS)}.")
+                settings["action"] = value
+            else:
+                parse_duration(value)
+                settings["timeout"] = value
+            guild_config.set(ctx.guild.id, "automod", settings)
+            await ctx.send(f"🛡️ **Success:** Automod `{rule}` set to `{value}`.")
+        except ValueError:
+            await ctx.send("❌ **Error:** Wrong value for that rule. Use on/off, a number, or a duration like `10m`.")
+        except Exception as e:
+            await ctx.send(f"⚠️ **Error:** Could not update the rule. Error: {e}")
+
+    @bot.listen("on_member_join")
+    async def detect_raid(member):
+        if not guild_config.get(member.guild.id, "antispam", {}).get("raid"):
+            return
+        raiders = spam_detector.join(member.guild.id, member.id)
+        if raiders:
+            await handle_raid(bot, member.guild, raiders)
+
+    @bot.hybrid_command(name="antispam")
+    @commands.has_permissions(manage_guild=True)
+    async def antispam(ctx, mode: typing.Literal["spam", "raid"], enabled: bool):
+        """Turn automatic spam timeouts or raid lockdowns on or off"""
+        try:
+            settings = {**guild_config.get(ctx.guild.id, "antispam", {}), mode: enabled}
+            guild_config.set(ctx.guild.id, "antispam", settings)
+            what = "Spam timeouts" if mode == "spam" else "Raid lockdowns"
+            await ctx.send(f"🚫 **Success:** {what} are now {'on' if enabled else 'off'}.")
+        except Exception as e:
+            await ctx.send(f"⚠️ **Error:** Could not change anti-spam. Error: {e}")
+
+    @bot.hybrid_command(name="logchannel")
+    @commands.has_permissions(manage_guild=True)
+    async def logchannel(ctx, channel: discord.TextChannel = None):
+        """Set or turn off the moderation log channel"""
+        try:
+            if channel is None:
+                guild_config.delete(ctx.guild.id, "log_channel")
+                await ctx.send("📝 **Success:** Moderation logging is turned off.")
+            else:
+                guild_config.set(ctx.guild.id, "log_channel", channel.id)
+                await ctx.send(f"📝 **Success:** Moderation actions will be logged in {channel.mention}.")
+        except Exception as e:
+            await ctx.send(f"⚠️ **Error:** Could not set the log channel. Error: {e}")
+
     @bot.hybrid_command(name="steal")
     @commands.has_permissions(manage_emojis=True)
     async def steal(
@@ -309,6 +811,7 @@ def setup_moderation(bot):
         emoji_or_url: str,
         name: typing.Optional[str] = None
     ):
+        """Add an emoji from another server or an image URL"""
         try:
             try:
                 partial_emoji = await commands.PartialEmojiConverter().convert(ctx, emoji_or_url)
@@ -323,7 +826,7 @@ def setup_moderation(bot):
                     reason=f"Stolen by {ctx.author}"
                 )
                 await ctx.send(f"😀 **Success:** Emoji `{partial_emoji.name}` added to the server!")
-                await log_action(bot, "Steal Emoji", new_emoji.name, "Stolen from another server", ctx.author)
+                log_action(bot, "Steal Emoji", new_emoji.name, "Stolen from another server", ctx.author)
                 return
             except commands.PartialEmojiConversionFailure:
                 if name is None:
@@ -361,7 +864,7 @@ def setup_moderation(bot):
                             reason=f"Added by {ctx.author} from URL"
                         )
                         await ctx.send(f"😀 **Success:** Emoji `{name}` added to the server!")
-                        await log_action(bot, "Add Emoji", new_emoji.name, f"Added from URL: {image_url}", ctx.author)
+                        log_action(bot, "Add Emoji", new_emoji.name, f"Added from URL: {image_url}", ctx.author)
 
         except discord.HTTPException as e:
             if e.code == 30008:
@@ -1,14 +1,58 @@
 from discord.ext import commands
 import discord
 import time
-import asyncio
 from datetime import datetime, timedelta
 import re
 import aiohttp
+from bot.utils.guild_config import guild_config
+from bot.utils.reminders import reminders, MAX_REMINDERS_PER_USER
+from bot.utils.guild_stats import guild_stats
 
 start_time = time.time()
+DEFAULT_SUGGESTION_CHANNEL_ID = 1393148853095764009  # Used until a guild sets its own with suggestchannel
 
 def setup_utility(bot):
+    # --- Guild statistics for serverinfo and boosts, counted once and kept current ---
+    @bot.listen("on_guild_available")
+    async def stats_guild_available(guild):
+        guild_stats.build(guild)
+
+    @bot.listen("on_guild_join")
+    async def stats_guild_join(guild):
+        guild_stats.build(guild)
+
+    @bot.listen("on_guild_remove")
+    async def stats_guild_remove(guild):
+        guild_stats.forget(guild)
+
+    @bot.listen("on_member_join")
+    async def stats_member_join(member):
+        guild_stats.member_joined(member)
+
+    @bot.listen("on_raw_member_remove")
+    async def stats_member_remove(payload):
+        guild_stats.member_left(payload.guild_id, payload.user)
+
+    @bot.listen("on_member_update")
+    async def stats_member_update(before, after):
+        guild_stats.member_updated(before, after)
+
+    @bot.listen("on_guild_channel_create")
+    async def stats_channel_create(channel):
+        guild_stats.channel_changed(channel, 1)
+
+    @bot.listen("on_guild_channel_delete")
+    async def stats_channel_delete(channel):
+        guild_stats.channel_changed(channel, -1)
+
+    @bot.listen("on_guild_role_create")
+    async def stats_role_create(role):
+        guild_stats.role_changed(role, 1)
+
+    @bot.listen("on_guild_role_delete")
+    async def stats_role_delete(role):
+        guild_stats.role_changed(role, -1)
+
     @bot.hybrid_command(name="ping")
     async def ping(ctx):
         """Check the bot's latency"""
@@ -39,7 +83,7 @@ def setup_utility(bot):
             embed = discord.Embed(title="ℹ️ Bot Help", color=0x5865F2)
             embed.add_field(
                 name="Utility Commands",
-                value="`ping`, `uptime`, `userinfo`, `avatar`, `serverinfo`, `roleinfo`, `emojis`, `boosts`, `remindme`, `invite`, `support`, `suggest`, `say`",
+                value="`ping`, `uptime`, `userinfo`, `avatar`, `serverinfo`, `roleinfo`, `emojis`, `boosts`, `remindme`, `reminders`, `cancelreminder`, `invite`, `support`, `suggest`, `say`",
                 inline=False
             )
             embed.set_footer(text=f"Requested by {ctx.author}", icon_url=ctx.author.display_avatar.url)
@@ -100,6 +144,7 @@ def setup_utility(bot):
         """Get detailed information about this server"""
         try:
             guild = ctx.guild
+            stats = guild_stats.get(guild)
             embed = discord.Embed(
                 title=f"ℹ️ Server Info: {guild.name}",
                 color=0x5865F2,
@@ -111,9 +156,10 @@ def setup_utility(bot):
             embed.add_field(name="🆔 Server ID", value=f"`{guild.id}`", inline=True)
             embed.add_field(name="📅 Created", value=f"<t:{int(guild.created_at.timestamp())}:R>", inline=True)
             
-            embed.add_field(name="👥 Members", value=f"Total: {guild.member_count}\nHumans: {sum(not m.bot for m in guild.members)}\nBots: {sum(m.bot for m in guild.members)}", inline=True)
-            embed.add_field(name="💎 Boosts", value=f"Level {guild.premium_tier}\n{guild.premium_subscription_count} boosts", inline=True)
-            embed.add_field(name="📊 Channels", value=f"Text: {len(guild.text_channels)}\nVoice: {len(guild.voice_channels)}\nCategories: {len(guild.categories)}", inline=True)
+            embed.add_field(name="👥 Members", value=f"Total: {guild.member_count}\nHumans: {stats.humans}\nBots: {stats.bots}", inline=True)
+            embed.add_field(name="💎 Boosts", value=f"Level {guild.premium_tier}\n{guild.premium_subscription_count} boosts\n{len(stats.boosters)} boosters", inline=True)
+            embed.add_field(name="📊 Channels", value=f"Text: {stats.text}\nVoice: {stats.voice}\nCategories: {stats.categories}" + (f"\nOther: {stats.other}" if stats.other else ""), inline=True)
+            embed.add_field(name="🎭 Roles", value=str(stats.roles), inline=True)
             embed.add_field(name="🔐 Verification", value=str(guild.verification_level).title(), inline=True)
             embed.add_field(name="😀 Emojis", value=f"{len(guild.emojis)}/{guild.emoji_limit}", inline=True)
             embed.add_field(name="🎨 Features", value=", ".join([f"`{f}`" for f in guild.features]) or "None", inline=False)
@@ -184,10 +230,12 @@ def setup_utility(bot):
                 if next_level <= 3:
                     needed = {1: 2, 2: 15, 3: 30}[next_level] - guild.premium_subscription_count
                     embed.add_field(name="Next Level", value=f"Need {needed} more boost{'s' if needed != 1 else ''} for level {next_level}")
-            if hasattr(guild, "premium_subscribers") and guild.premium_subscribers:
-                boost_list = "\n".join(m.mention for m in guild.premium_subscribers[:10])
-                if len(guild.premium_subscribers) > 10:
-                    boost_list += f"\n+{len(guild.premium_subscribers)-10} more"
+            boosters = guild_stats.get(guild).boosters
+            if boosters:
+                # Mentions render from the ID alone, so no member lookups are needed
+                boost_list = "\n".join(f"<@{member_id}>" for member_id in list(boosters)[:10])
+                if len(boosters) > 10:
+                    boost_list += f"\n+{len(boosters)-10} more"
                 embed.add_field(name="Boosters", value=boost_list, inline=False)
             if guild.banner:
                 embed.set_image(url=guild.banner.url)
@@ -206,20 +254,49 @@ def setup_utility(bot):
             seconds = num * {'s': 1, 'm': 60, 'h': 3600, 'd': 86400}[unit]
             if seconds > 2592000:
                 return await ctx.send("❌ **Error:** Maximum reminder is 30 days (2,592,000 seconds).")
+            if reminders.count_for(ctx.author.id) >= MAX_REMINDERS_PER_USER:
+                return await ctx.send(f"❌ **Error:** You already have {MAX_REMINDERS_PER_USER} reminders. Cancel one with `cancelreminder` first.")
             time_names = {'s': 'second', 'm': 'minute', 'h': 'hour', 'd': 'day'}
             human_time = f"{num} {time_names[unit]}{'s' if num != 1 else ''}"
+            entry = reminders.add(ctx.author.id, ctx.channel.id, ctx.guild.id if ctx.guild else None, seconds, reminder)
             embed = discord.Embed(
                 title="⏰ Reminder Set!",
                 description=f"I will remind you in **{human_time}** about:\n\n> {reminder}",
                 color=0x5865F2
             )
-            embed.set_footer(text=f"Reminder set by {ctx.author}", icon_url=ctx.author.display_avatar.url)
+            embed.set_footer(text=f"Reminder #{entry.id} set by {ctx.author}", icon_url=ctx.author.display_avatar.url)
             await ctx.send(embed=embed)
-            await asyncio.sleep(seconds)
-            await ctx.send(f"{ctx.author.mention} ⏰ **Reminder:** {reminder}")
         except Exception as e:
             await ctx.send(f"⚠️ **Error:** Could not set reminder. Error: {e}")
 
+    @bot.hybrid_command(name="reminders")
+    async def list_reminders(ctx):
+        """List your pending reminders"""
+        try:
+            pending = reminders.pending_for(ctx.author.id)
+            if not pending:
+                return await ctx.send("⏰ **Info:** You have no pending reminders.")
+            embed = discord.Embed(
+                title=f"⏰ Your Reminders ({len(pending)})",
+                description="\n".join(f"`#{r.id}` <t:{int(r.due_at)}:R> - {r.text[:100]}" for r in pending),
+                color=0x5865F2
+            )
+            embed.set_footer(text="Cancel one with cancelreminder <id>")
+            await ctx.send(embed=embed)
+        except Exception as e:
+            await ctx.send(f"⚠️ **Error:** Could not list reminders. Error: {e}")
+
+    @bot.hybrid_command(name="cancelreminder")
+    async def cancelreminder(ctx, reminder_id: int):
+        """Cancel one of your reminders by its id"""
+        try:
+            if reminders.cancel(ctx.author.id, reminder_id):
+                await ctx.send(f"🗑️ **Success:** Reminder #{reminder_id} cancelled.")
+            else:
+                await ctx.send(f"❌ **Error:** You have no pending reminder #{reminder_id}.")
+        except Exception as e:
+            await ctx.send(f"⚠️ **Error:** Could not cancel reminder. Error: {e}")
+
     @bot.hybrid_command(name="invite")
     async def invite(ctx):
         """Get the bot's invite link"""
@@ -259,9 +336,9 @@ def setup_utility(bot):
     @bot.hybrid_command(name="suggest")
     async def suggest(ctx, *, suggestion):
         """Send a suggestion to the suggestion channel"""
-        SUGGESTION_CHANNEL_ID = 1393148853095764009  # <-- Change to your suggestion channel ID
         try:
-            channel = bot.get_channel(SUGGESTION_CHANNEL_ID)
+            channel_id = guild_config.get(ctx.guild.id, "suggestion_channel", DEFAULT_SUGGESTION_CHANNEL_ID) if ctx.guild else DEFAULT_SUGGESTION_CHANNEL_ID
+            channel = bot.get_channel(channel_id)
             if not channel:
                 return await ctx.send("❌ **Error:** Suggestion channel not found. Please contact the staff!")
             embed = discord.Embed(
@@ -276,6 +353,16 @@ def setup_utility(bot):
         except Exception as e:
             await ctx.send(f"⚠️ **Error:** Could not send suggestion. Error: {e}")
 
+    @bot.hybrid_command(name="suggestchannel")
+    @commands.has_permissions(manage_guild=True)
+    async def suggestchannel(ctx, channel: discord.TextChannel):
+        """Set the channel where suggestions are sent"""
+        try:
+            guild_config.set(ctx.guild.id, "suggestion_channel", channel.id)
+            await ctx.send(f"✅ **Success:** Suggestions will be sent to {channel.mention}.")
+        except Exception as e:
+            await ctx.send(f"⚠️ **Error:** Could not set the suggestion channel. Error: {e}")
+
     @bot.hybrid_command(name="say")
     @commands.has_permissions(manage_messages=True)
     async def say(ctx, *, message: str):
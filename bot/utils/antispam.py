@@ -0,0 +1,94 @@
+import os
+import time
+from collections import OrderedDict, deque
+from dotenv import load_dotenv
+from bot.utils.ratelimit import parse_rate
+
+load_dotenv()
+SPAM_MESSAGES = parse_rate(os.getenv("SPAM_MESSAGES", "6/5"))  # Messages per seconds from one member
+SPAM_DUPLICATES = parse_rate(os.getenv("SPAM_DUPLICATES", "4/30"))  # Identical messages per seconds
+RAID_JOINS = parse_rate(os.getenv("RAID_JOINS", "10/15"))  # Joins per seconds in one guild
+SPAM_TIMEOUT = int(os.getenv("SPAM_TIMEOUT", "300"))  # Seconds a spammer is timed out for
+SPAM_MAX_TRACKED = int(os.getenv("SPAM_MAX_TRACKED", "50000"))  # Members with a window kept in memory
+
+
+class _MemberWindow:
+    __slots__ = ("times", "hashes", "last_seen")
+
+    def __init__(self, messages, duplicates):
+        self.times = deque(maxlen=messages)
+        self.hashes = deque(maxlen=duplicates)  # (content hash, time)
+        self.last_seen = 0.0
+
+
+class SpamDetector:
+    """Sliding windows of recent messages per member and joins per guild.
+
+    Each window is a deque capped at the count that trips it, so a check
+    only compares the newest entry with the oldest one: O(1) per event.
+    Member windows are kept in least-recently-seen order; ones idle longer
+    than any window are dropped from the front as others are touched, and
+    SPAM_MAX_TRACKED caps how many are kept at all.
+    """
+
+    def __init__(self, messages=SPAM_MESSAGES, duplicates=SPAM_DUPLICATES, joins=RAID_JOINS, max_tracked=SPAM_MAX_TRACKED):
+        self.messages, self.message_seconds = messages
+        self.duplicates, self.duplicate_seconds = duplicates
+        self.joins, self.join_seconds = joins
+        self.max_tracked = max_tracked
+        self.idle = max(self.message_seconds, self.duplicate_seconds)
+        self.members = OrderedDict()  # (guild_id, user_id) -> _MemberWindow
+        self.guilds = {}  # guild_id -> deque of (time, user_id)
+
+    def message(self, guild_id, user_id, content, now=None):
+        """Record a message; returns why it counts as spam, or None."""
+        now = time.monotonic() if now is None else now
+        key = (guild_id, user_id)
+        window = self.members.get(key)
+        if window is None:
+            window = self.members[key] = _MemberWindow(self.messages, self.duplicates)
+        else:
+            self.members.move_to_end(key)
+        window.last_seen = now
+        self._evict(now)
+
+        window.times.append(now)
+        if len(window.times) == self.messages and now - window.times[0] <= self.message_seconds:
+            return f"Message flood ({self.messages} in {self.message_seconds:g}s)"
+
+        digest = hash(content.strip().lower())
+        window.hashes.append((digest, now))
+        if (
+            len(window.hashes) == self.duplicates
+            and now - window.hashes[0][1] <= self.duplicate_seconds
+            and all(h == digest for h, _ in window.hashes)
+        ):
+            return f"Repeated message ({self.duplicates} times)"
+        return None
+
+    def reset(self, guild_id, user_id):
+        """Forget a member's window, e.g. after acting on it, so one burst triggers once."""
+        self.members.pop((guild_id, user_id), None)
+
+    def join(self, guild_id, user_id, now=None):
+        """Record a member join; returns the IDs of the recent joiners when it looks like a raid."""
+        now = time.monotonic() if now is None else now
+        joins = self.guilds.get(guild_id)
+        if joins is None:
+            joins = self.guilds[guild_id] = deque(maxlen=self.joins)
+        joins.append((now, user_id))
+        if len(joins) == self.joins and now - joins[0][0] <= self.join_seconds:
+            raiders = [user_id for _, user_id in joins]
+            joins.clear()  # The next report needs a fresh window of joins
+            return raiders
+        return None
+
+    def _evict(self, now):
+        while self.members:
+            key, window = next(iter(self.members.items()))
+            if len(self.members) <= self.max_tracked and now - window.last_seen < self.idle:
+                break
+            del self.members[key]
+
+
+spam_detector = SpamDetector()
@@ -0,0 +1,133 @@
+import re
+from bot.utils.guild_config import guild_config
+
+INVITE_RE = re.compile(r"(?:discord\.gg|discord(?:app)?\.com/invite)/\S+", re.IGNORECASE)
+LINK_RE = re.compile(r"https?://\S+", re.IGNORECASE)
+WORD_RE = re.compile(r"\w+")
+LETTER_RE = re.compile(r"[^\W\d_]")
+UPPER_RE = re.compile(r"[A-ZÀ-ÖØ-ÞΑ-ΩА-ЯЁ]")  # Capitals of the Latin, Greek and Cyrillic alphabets
+
+ACTIONS = ("delete", "warn", "timeout")
+DEFAULT_RULES = {
+    "enabled": False,
+    "words": [],
+    "invites": False,
+    "links": False,
+    "max_mentions": 0,  # 0 = off
+    "caps_percent": 0,  # 0 = off
+    "caps_min_length": 10,  # Shorter messages are never caps-checked
+    "action": "delete",
+    "timeout": "10m",
+}
+
+
+def _trie_pattern(node):
+    # Regex for a trie node; "" marks the end of a word
+    leaves = [re.escape(ch) for ch, child in node.items() if ch and child == {"": True}]
+    branches = [re.escape(ch) + _trie_pattern(child) for ch, child in node.items() if ch and child != {"": True}]
+    if len(leaves) == 1:
+        branches.append(leaves[0])
+    elif leaves:
+        branches.append("[" + "".join(leaves) + "]")
+    if not branches:
+        return ""
+    pattern = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+    if "" in node:
+        pattern = f"(?:{pattern})?"
+    return pattern
+
+
+def compile_phrases(words):
+    """One case-insensitive regex matching any of the words as whole words.
+
+    The words are merged into a trie first, so shared prefixes are matched
+    once and a position that starts no word fails on its first character,
+    much like an Aho-Corasick automaton; a plain "a|b|c" alternation would
+    try every word at every position.
+    """
+    trie = {}
+    for word in words:
+        node = trie
+        for ch in word.lower():
+            node = node.setdefault(ch, {})
+        node[""] = True
+    if not trie:
+        return None
+    return re.compile(rf"(?<!\w){_trie_pattern(trie)}(?!\w)", re.IGNORECASE)
+
+
+class CompiledRules:
+    __slots__ = ("words", "phrases", "invites", "links", "max_mentions", "caps_ratio", "caps_min_length", "action", "timeout")
+
+    def __init__(self, settings):
+        words = [w.lower() for w in settings["words"]]
+        # Single plain words are found with one set lookup per token of the message;
+        # only phrases and words with symbols need the regex
+        self.words = frozenset(w for w in words if WORD_RE.fullmatch(w))
+        self.phrases = compile_phrases([w for w in words if not WORD_RE.fullmatch(w)])
+        self.invites = settings["invites"]
+        self.links = settings["links"]
+        self.max_mentions = settings["max_mentions"]
+        self.caps_ratio = settings["caps_percent"] / 100
+        self.caps_min_length = settings["caps_min_length"]
+        self.action = settings["action"]
+        self.timeout = settings["timeout"]
+
+
+class AutoMod:
+    """Per-guild automod rules, compiled once and cached.
+
+    A guild's rules are compiled on its first message and dropped when its
+    "automod" setting changes, so checking a message is a dict lookup plus
+    a few precompiled regex scans.
+    """
+
+    def __init__(self, config=guild_config):
+        self.config = config
+        self.compiled = {}  # guild_id -> CompiledRules, or None when automod is off
+        config.subscribe("automod", self._settings_changed)
+
+    def settings(self, guild_id):
+        """The guild's automod settings with defaults filled in."""
+        return {**DEFAULT_RULES, **self.config.get(guild_id, "automod", {})}
+
+    def rules(self, guild_id):
+        try:
+            return self.compiled[guild_id]
+        except KeyError:
+            settings = self.settings(guild_id)
+            rules = self.compiled[guild_id] = CompiledRules(settings) if settings["enabled"] else None
+            return rules
+
+    def check(self, message):
+        """(rules, reason) for the first rule the message breaks, or None."""
+        rules = self.rules(message.guild.id)
+        if rules is None:
+            return None
+        content = message.content
+        if rules.words and not rules.words.isdisjoint(WORD_RE.findall(content.lower())):
+            return rules, "Banned word"
+        if rules.phrases is not None and rules.phrases.search(content):
+            return rules, "Banned word"
+        if rules.invites and INVITE_RE.search(content):
+            return rules, "Invite link"
+        if rules.links and LINK_RE.search(content):
+            return rules, "Link"
+        if rules.max_mentions:
+            mentions = len(message.raw_mentions) + len(message.raw_role_mentions) + message.mention_everyone
+            if mentions > rules.max_mentions:
+                return rules, f"Too many mentions ({mentions})"
+        if rules.caps_ratio and len(content) >= rules.caps_min_length:
+            capitals = len(UPPER_RE.findall(content))
+            # Too few capitals to reach the ratio on a long enough message; skips counting letters
+            if capitals >= rules.caps_ratio * rules.caps_min_length:
+                letters = len(LETTER_RE.findall(content))
+                if letters >= rules.caps_min_length and capitals / letters >= rules.caps_ratio:
+                    return rules, "Too many capital letters"
+        return None
+
+    def _settings_changed(self, guild_id, old, new):
+        self.compiled.pop(guild_id, None)
+
+
+automod = AutoMod()
@@ -0,0 +1,99 @@
+import os
+import re
+import time
+import asyncio
+from dotenv import load_dotenv
+
+load_dotenv()
+BULK_MAX_CONCURRENCY = int(os.getenv("BULK_MAX_CONCURRENCY", "8"))
+BULK_MAX_TARGETS = int(os.getenv("BULK_MAX_TARGETS", "1000"))
+BULK_SLOW_CALL = float(os.getenv("BULK_SLOW_CALL", "1.0"))  # Seconds; slower calls were rate limited
+BULK_PROGRESS_INTERVAL = 2.0  # Seconds between status message edits
+
+ID_RE = re.compile(r"\d{15,20}")  # Snowflakes, bare or inside <@...> mentions
+
+
+def parse_ids(text):
+    """User IDs from a string of IDs and mentions, in order, without duplicates."""
+    return list(dict.fromkeys(int(match) for match in ID_RE.findall(text or "")))
+
+
+class AdaptiveLimiter:
+    """Concurrency limit that backs off when Discord starts throttling.
+
+    discord.py already follows the per-route rate-limit headers and sleeps
+    when a bucket is empty; those sleeps show up here as slow calls. The
+    limit is halved on slow or rate-limited calls and grows by one after a
+    run of fast ones (AIMD), so bulk actions run as wide as the route allows.
+    """
+
+    def __init__(self, maximum=BULK_MAX_CONCURRENCY, slow=BULK_SLOW_CALL):
+        self.maximum = maximum
+        self.slow = slow
+        self.limit = max(1, maximum // 2)
+        self.active = 0
+        self.fast_streak = 0
+        self.last_cut = 0.0
+        self.changed = asyncio.Condition()
+
+    async def acquire(self):
+        async with self.changed:
+            await self.changed.wait_for(lambda: self.active < self.limit)
+            self.active += 1
+
+    async def release(self, elapsed, throttled=False):
+        async with self.changed:
+            self.active -= 1
+            if throttled or elapsed >= self.slow:
+                # Calls in flight during one throttle all come back slow; cut once for them
+                now = time.monotonic()
+                if now - self.last_cut >= self.slow:
+                    self.limit = max(1, self.limit // 2)
+                    self.last_cut = now
+                self.fast_streak = 0
+            else:
+                self.fast_streak += 1
+                if self.fast_streak >= self.limit and self.limit < self.maximum:
+                    self.limit += 1
+                    self.fast_streak = 0
+            self.changed.notify_all()
+
+
+async def run_bulk(targets, action, on_progress=None, limiter=None):
+    """Run `await action(target)` for every target under an AdaptiveLimiter.
+
+    Returns (succeeded, failed) where failed holds (target, error message)
+    pairs; one target failing never stops the rest. on_progress(done, total)
+    is awaited every BULK_PROGRESS_INTERVAL seconds while the run lasts.
+    """
+    limiter = limiter or AdaptiveLimiter()
+    succeeded, failed = [], []
+
+    async def run_one(target):
+        await limiter.acquire()
+        started = time.monotonic()
+        throttled = False
+        try:
+            await action(target)
+            succeeded.append(target)
+        except Exception as e:
+            throttled = getattr(e, "status", None) == 429
+            failed.append((target, str(e) or type(e).__name__))
+        finally:
+            await limiter.release(time.monotonic() - started, throttled)
+
+    async def report():
+        while True:
+            await asyncio.sleep(BULK_PROGRESS_INTERVAL)
+            try:
+                await on_progress(len(succeeded) + len(failed), len(targets))
+            except Exception as e:
+                print(f"Bulk Progress Error: {e}")
+
+    reporter = asyncio.create_task(report()) if on_progress else None
+    try:
+        await asyncio.gather(*(run_one(target) for target in targets))
+    finally:
+        if reporter:
+            reporter.cancel()
+    return succeeded, failed
@@ -0,0 +1,152 @@
+import time
+import asyncio
+import threading
+from collections import OrderedDict
+from bot.utils.db import DATABASE_PATH, connect
+
+CASES_PER_PAGE = 10
+CASE_CACHE_SIZE = 1024  # Members whose recently read pages stay in memory
+
+
+class Case:
+    __slots__ = ("id", "guild_id", "user_id", "moderator_id", "action", "reason", "created_at")
+
+    def __init__(self, id, guild_id, user_id, moderator_id, action, reason, created_at):
+        self.id = id
+        self.guild_id = guild_id
+        self.user_id = user_id
+        self.moderator_id = moderator_id
+        self.action = action
+        self.reason = reason
+        self.created_at = created_at
+
+
+class CaseStore:
+    """Moderation cases (warns, kicks, bans, timeouts, role changes) in SQLite.
+
+    A new case gets its id at once and is inserted with others in one batch a
+    moment later (write-behind). Queries run in a worker thread against the
+    (guild_id, user_id, created_at) index; the pages read most recently are
+    cached per member until that member gets a new case.
+    """
+
+    def __init__(self, path=DATABASE_PATH, flush_delay=1.0, cache_size=CASE_CACHE_SIZE):
+        self.path = path
+        self.flush_delay = flush_delay
+        self.cache_size = cache_size
+        self.conn = None
+        self.lock = threading.Lock()
+        self.next_id = None
+        self.pending = []  # Cases not written yet
+        self.flush_task = None
+        self.pages = OrderedDict()  # (guild_id, user_id) -> {(action, page, per_page): (cases, total)}
+        self.version = 0  # Bumped on every change, so a query racing a change is not cached
+
+    def load(self):
+        if self.conn is not None:
+            return
+        self.conn = connect(self.path)
+        with self.lock, self.conn:
+            self.conn.execute(
+                "CREATE TABLE IF NOT EXISTS cases ("
+                "id INTEGER PRIMARY KEY, guild_id INTEGER NOT NULL, user_id INTEGER NOT NULL, "
+                "moderator_id INTEGER, action TEXT NOT NULL, reason TEXT, created_at REAL NOT NULL)"
+            )
+            self.conn.execute(
+                "CREATE INDEX IF NOT EXISTS cases_member ON cases (guild_id, user_id, created_at)"
+            )
+            (last_id,) = self.conn.execute("SELECT MAX(id) FROM cases").fetchone()
+        self.next_id = (last_id or 0) + 1
+
+    def add(self, guild_id, user_id, moderator_id, action, reason=None):
+        """Record a case and return it; the database write happens in the background."""
+        if self.conn is None:
+            self.load()
+        case = Case(self.next_id, guild_id, user_id, moderator_id, action, reason, time.time())
+        self.next_id += 1
+        self.pending.append(case)
+        self._invalidate(guild_id, user_id)
+        if self.flush_task is None or self.flush_task.done():
+            self.flush_task = asyncio.create_task(self._flush_later())
+        return case
+
+    async def history(self, guild_id, user_id, action=None, page=0, per_page=CASES_PER_PAGE):
+        """One page of a member's cases, newest first, and their total count."""
+        member = (guild_id, user_id)
+        key = (action, page, per_page)
+        cached = self.pages.get(member)
+        if cached is not None and key in cached:
+            self.pages.move_to_end(member)
+            return cached[key]
+
+        await self.flush()  # Pending cases must show up in the query
+        version = self.version
+        result = await asyncio.to_thread(self._query, guild_id, user_id, action, page, per_page)
+        if version == self.version:
+            self.pages.setdefault(member, {})[key] = result
+            self.pages.move_to_end(member)
+            if len(self.pages) > self.cache_size:
+                self.pages.popitem(last=False)
+        return result
+
+    async def clear(self, guild_id, user_id, action=None):
+        """Delete a member's cases, optionally of one action only. Returns how many."""
+        await self.flush()
+        self._invalidate(guild_id, user_id)
+        try:
+            return await asyncio.to_thread(self._delete, guild_id, user_id, action)
+        finally:
+            # Again once the delete has committed: a history() that started while it ran
+            # may have read the old rows and cached them under the first bump
+            self._invalidate(guild_id, user_id)
+
+    def _invalidate(self, guild_id, user_id):
+        self.version += 1
+        self.pages.pop((guild_id, user_id), None)
+
+    async def _flush_later(self):
+        await asyncio.sleep(self.flush_delay)
+        await self.flush()
+
+    async def flush(self):
+        """Insert all pending cases in one transaction."""
+        if not self.pending:
+            return
+        batch, self.pending = self.pending, []
+        try:
+            await asyncio.to_thread(self._insert, batch)
+        except Exception as e:
+            print(f"Case Write Error: {e}")
+            self.pending[:0] = batch  # Retry with the next flush
+
+    def _insert(self, batch):
+        with self.lock, self.conn:
+            self.conn.executemany(
+                "INSERT INTO cases (id, guild_id, user_id, moderator_id, action, reason, created_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                [(c.id, c.guild_id, c.user_id, c.moderator_id, c.action, c.reason, c.created_at) for c in batch],
+            )
+
+    def _where(self, guild_id, user_id, action):
+        if action is None:
+            return "guild_id = ? AND user_id = ?", (guild_id, user_id)
+        return "guild_id = ? AND user_id = ? AND action = ?", (guild_id, user_id, action)
+
+    def _query(self, guild_id, user_id, action, page, per_page):
+        where, params = self._where(guild_id, user_id, action)
+        with self.lock:
+            (total,) = self.conn.execute(f"SELECT COUNT(*) FROM cases WHERE {where}", params).fetchone()
+            rows = self.conn.execute(
+                "SELECT id, guild_id, user_id, moderator_id, action, reason, created_at "
+                f"FROM cases WHERE {where} ORDER BY created_at DESC, id DESC LIMIT ? OFFSET ?",
+                params + (per_page, page * per_page),
+            ).fetchall()
+        return [Case(*row) for row in rows], total
+
+    def _delete(self, guild_id, user_id, action):
+        where, params = self._where(guild_id, user_id, action)
+        with self.lock, self.conn:
+            return self.conn.execute(f"DELETE FROM cases WHERE {where}", params).rowcount
+
+
+case_store = CaseStore()
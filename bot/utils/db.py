@@ -0,0 +1,20 @@
+import os
+import sqlite3
+from dotenv import load_dotenv
+
+load_dotenv()
+DATABASE_PATH = os.getenv("DATABASE_PATH", "data/coco.db")
+
+
+def connect(path=DATABASE_PATH):
+    """Open a SQLite connection in WAL mode.
+
+    Stores run their queries in worker threads (asyncio.to_thread), so the
+    connection may be used from any thread; each store guards its own
+    connection with a lock.
+    """
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    conn = sqlite3.connect(path, check_same_thread=False)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")  # Safe with WAL, far fewer fsyncs
+    return conn
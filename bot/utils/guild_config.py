@@ -0,0 +1,112 @@
+import json
+import asyncio
+import threading
+from bot.utils.db import DATABASE_PATH, connect
+
+_DELETED = object()  # Marks a pending delete in the write-behind buffer
+
+
+class GuildConfig:
+    """Per-guild settings.
+
+    SQLite is the source of truth, but every row is loaded into a dict on
+    first use, so reads on the message hot path never touch the database.
+    Changes update the dict at once and are written to SQLite in batches a
+    moment later (write-behind).
+    """
+
+    def __init__(self, path=DATABASE_PATH, flush_delay=2.0):
+        self.path = path
+        self.flush_delay = flush_delay
+        self.conn = None
+        self.lock = threading.Lock()
+        self.settings = None  # guild_id -> {key: value}
+        self.dirty = {}  # (guild_id, key) -> value or _DELETED
+        self.flush_task = None
+        self.listeners = {}  # key -> callbacks(guild_id, old, new)
+
+    def subscribe(self, key, callback):
+        """Call callback(guild_id, old, new) whenever `key` changes in a guild."""
+        self.listeners.setdefault(key, []).append(callback)
+
+    def load(self):
+        if self.settings is not None:
+            return
+        self.conn = connect(self.path)
+        with self.lock, self.conn:
+            self.conn.execute(
+                "CREATE TABLE IF NOT EXISTS guild_settings ("
+                "guild_id INTEGER NOT NULL, key TEXT NOT NULL, value TEXT NOT NULL, "
+                "PRIMARY KEY (guild_id, key))"
+            )
+            rows = self.conn.execute("SELECT guild_id, key, value FROM guild_settings").fetchall()
+        self.settings = {}
+        for guild_id, key, value in rows:
+            self.settings.setdefault(guild_id, {})[key] = json.loads(value)
+
+    def get(self, guild_id, key, default=None):
+        if self.settings is None:
+            self.load()
+        return self.settings.get(guild_id, {}).get(key, default)
+
+    def items(self, key):
+        """(guild_id, value) for every guild that has `key` set."""
+        if self.settings is None:
+            self.load()
+        return [(guild_id, values[key]) for guild_id, values in self.settings.items() if key in values]
+
+    def set(self, guild_id, key, value):
+        if self.settings is None:
+            self.load()
+        values = self.settings.setdefault(guild_id, {})
+        old = values.get(key)
+        values[key] = value
+        self._mark(guild_id, key, value)
+        self._notify(guild_id, key, old, value)
+
+    def delete(self, guild_id, key):
+        if self.settings is None:
+            self.load()
+        old = self.settings.get(guild_id, {}).pop(key, None)
+        self._mark(guild_id, key, _DELETED)
+        self._notify(guild_id, key, old, None)
+
+    def _notify(self, guild_id, key, old, new):
+        for callback in self.listeners.get(key, ()):
+            callback(guild_id, old, new)
+
+    def _mark(self, guild_id, key, value):
+        self.dirty[(guild_id, key)] = value
+        if self.flush_task is None or self.flush_task.done():
+            self.flush_task = asyncio.create_task(self._flush_later())
+
+    async def _flush_later(self):
+        await asyncio.sleep(self.flush_delay)
+        await self.flush()
+
+    async def flush(self):
+        """Write all pending changes in one transaction."""
+        if not self.dirty:
+            return
+        batch, self.dirty = self.dirty, {}
+        try:
+            await asyncio.to_thread(self._write, batch)
+        except Exception as e:
+            print(f"Config Write Error: {e}")
+            # Keep the failed changes for the next flush unless newer ones replaced them
+            for item, value in batch.items():
+                self.dirty.setdefault(item, value)
+
+    def _write(self, batch):
+        upserts = [(g, k, json.dumps(v)) for (g, k), v in batch.items() if v is not _DELETED]
+        deletes = [(g, k) for (g, k), v in batch.items() if v is _DELETED]
+        with self.lock, self.conn:
+            self.conn.executemany(
+                "INSERT INTO guild_settings (guild_id, key, value) VALUES (?, ?, ?) "
+                "ON CONFLICT (guild_id, key) DO UPDATE SET value = excluded.value",
+                upserts,
+            )
+            self.conn.executemany("DELETE FROM guild_settings WHERE guild_id = ? AND key = ?", deletes)
+
+
+guild_config = GuildConfig()
@@ -0,0 +1,93 @@
+import discord
+
+
+def _channel_kind(channel):
+    if isinstance(channel, discord.CategoryChannel):
+        return "categories"
+    if isinstance(channel, discord.VoiceChannel):
+        return "voice"
+    if isinstance(channel, discord.TextChannel):
+        return "text"
+    return "other"  # Forum and stage channels
+
+
+class GuildStats:
+    __slots__ = ("humans", "bots", "boosters", "text", "voice", "categories", "other", "roles", "complete")
+
+    def __init__(self, guild):
+        self.humans = self.bots = 0
+        self.boosters = set()  # Member IDs
+        self.text = self.voice = self.categories = self.other = 0
+        for member in guild.members:
+            self.add_member(member)
+        for channel in guild.channels:
+            self.add_channel(channel, 1)
+        self.roles = len(guild.roles)
+        self.complete = guild.chunked  # False when counted before the member list finished loading
+
+    def add_member(self, member, delta=1):
+        if member.bot:
+            self.bots += delta
+        else:
+            self.humans += delta
+        if delta > 0 and member.premium_since:
+            self.boosters.add(member.id)
+        elif delta < 0:
+            self.boosters.discard(member.id)
+
+    def add_channel(self, channel, delta):
+        kind = _channel_kind(channel)
+        setattr(self, kind, getattr(self, kind) + delta)
+
+
+class GuildStatsTracker:
+    """Per-guild member, booster, channel and role counts.
+
+    Each guild is counted once when it becomes available and then kept up to
+    date from gateway events, so serverinfo and boosts read the numbers
+    instead of scanning every cached member.
+    """
+
+    def __init__(self):
+        self.guilds = {}  # guild_id -> GuildStats
+
+    def get(self, guild):
+        stats = self.guilds.get(guild.id)
+        # Rebuild once if the first count ran before the member list was loaded
+        if stats is None or (not stats.complete and guild.chunked):
+            stats = self.guilds[guild.id] = GuildStats(guild)
+        return stats
+
+    def build(self, guild):
+        self.guilds[guild.id] = GuildStats(guild)
+
+    def forget(self, guild):
+        self.guilds.pop(guild.id, None)
+
+    def member_joined(self, member):
+        if member.guild.id in self.guilds:
+            self.guilds[member.guild.id].add_member(member)
+
+    def member_left(self, guild_id, user):
+        if guild_id in self.guilds:
+            self.guilds[guild_id].add_member(user, -1)
+
+    def member_updated(self, before, after):
+        stats = self.guilds.get(after.guild.id)
+        if stats is None or before.premium_since == after.premium_since:
+            return
+        if after.premium_since:
+            stats.boosters.add(after.id)
+        else:
+            stats.boosters.discard(after.id)
+
+    def channel_changed(self, channel, delta):
+        if channel.guild.id in self.guilds:
+            self.guilds[channel.guild.id].add_channel(channel, delta)
+
+    def role_changed(self, role, delta):
+        if role.guild.id in self.guilds:
+            self.guilds[role.guild.id].roles += delta
+
+
+guild_stats = GuildStatsTracker()
@@ -0,0 +1,106 @@
+import discord
+from bot.utils.bulk import run_bulk, AdaptiveLimiter
+from bot.utils.guild_config import guild_config
+
+# Permissions denied to @everyone by a lockdown; a hidden lockdown also denies view_channel
+LOCK_PERMISSIONS = {
+    "send_messages": False,
+    "send_messages_in_threads": False,
+    "create_public_threads": False,
+    "create_private_threads": False,
+    "add_reactions": False,
+    "connect": False,
+}
+
+
+def lockdown_state(guild_id):
+    """The active lockdown of a guild, or None. Stored in guild_config so it survives restarts."""
+    return guild_config.get(guild_id, "lockdown")
+
+
+def lockable_channels(guild, category=None):
+    channels = category.channels if category else guild.channels
+    return [c for c in channels if not isinstance(c, discord.CategoryChannel)]
+
+
+def _locked_overwrite(current, hide):
+    overwrite = discord.PermissionOverwrite.from_pair(*current.pair())
+    overwrite.update(**LOCK_PERMISSIONS)
+    if hide:
+        overwrite.update(view_channel=False)
+    return overwrite
+
+
+async def lockdown(guild, channels, reason, hide=False, on_progress=None):
+    """Deny @everyone in `channels`, keeping their previous overwrites to restore later.
+
+    Returns (locked, failed) like run_bulk, or None if the guild is already
+    locked down. Channels whose overwrite already matches are left alone, and
+    no lockdown is recorded when no channel ended up changed.
+    """
+    if lockdown_state(guild.id):
+        return None
+    role = guild.default_role
+    snapshot, changes = {}, {}
+    for channel in channels:
+        current = channel.overwrites_for(role)
+        locked = _locked_overwrite(current, hide)
+        if locked.pair() == current.pair():
+            continue
+        has_overwrite = role in channel.overwrites
+        snapshot[str(channel.id)] = [p.value for p in current.pair()] if has_overwrite else None
+        changes[channel.id] = locked
+
+    if not changes:
+        return [], []  # Everything is already locked; no state to save or lift later
+
+    # Save the snapshot to disk first so a crash mid-way can still be undone with unlockdown
+    guild_config.set(guild.id, "lockdown", {"hide": hide, "channels": snapshot})
+    await guild_config.flush()
+    if (guild.id, "lockdown") in guild_config.dirty:
+        guild_config.delete(guild.id, "lockdown")
+        raise RuntimeError("could not save the lockdown snapshot, so no channels were changed")
+
+    async def lock(channel):
+        await channel.set_permissions(role, overwrite=changes[channel.id], reason=reason)
+
+    targets = [c for c in channels if c.id in changes]
+    locked, failed = await run_bulk(targets, lock, on_progress, AdaptiveLimiter())
+    # Channels we could not change need no restore
+    for channel, _ in failed:
+        snapshot.pop(str(channel.id), None)
+    if snapshot:
+        guild_config.set(guild.id, "lockdown", {"hide": hide, "channels": snapshot})
+    else:
+        guild_config.delete(guild.id, "lockdown")  # Nothing changed, so nothing to lift
+    return locked, failed
+
+
+async def lift(guild, reason, on_progress=None):
+    """Put back the @everyone overwrites saved by lockdown().
+
+    Returns (restored, failed), or None if there is no active lockdown.
+    Channels that failed stay in the snapshot so lifting can be retried.
+    """
+    state = lockdown_state(guild.id)
+    if not state:
+        return None
+    role = guild.default_role
+    snapshot = state["channels"]
+    channels = [c for c in (guild.get_channel(int(i)) for i in snapshot) if c is not None]
+
+    async def restore(channel):
+        saved = snapshot[str(channel.id)]
+        if saved is None:
+            overwrite = None  # There was no overwrite before; remove ours
+        else:
+            overwrite = discord.PermissionOverwrite.from_pair(discord.Permissions(saved[0]), discord.Permissions(saved[1]))
+        await channel.set_permissions(role, overwrite=overwrite, reason=reason)
+
+    restored, failed = await run_bulk(channels, restore, on_progress, AdaptiveLimiter())
+    remaining = {str(channel.id): snapshot[str(channel.id)] for channel, _ in failed}
+    if remaining:
+        guild_config.set(guild.id, "lockdown", {"hide": state["hide"], "channels": remaining})
+    else:
+        guild_config.delete(guild.id, "lockdown")
+    return restored, failed
@@ -0,0 +1,87 @@
+import os
+import asyncio
+import discord
+from dotenv import load_dotenv
+
+load_dotenv()
+LOG_FLUSH_INTERVAL = float(os.getenv("LOG_FLUSH_INTERVAL", "2.0"))  # Seconds to wait for a batch to fill
+LOG_MAX_PENDING = int(os.getenv("LOG_MAX_PENDING", "500"))  # Queued embeds per channel before dropping
+EMBEDS_PER_MESSAGE = 10  # Discord's limits for one message
+EMBED_CHARS_PER_MESSAGE = 6000
+
+
+class _ChannelQueue:
+    __slots__ = ("embeds", "full", "task", "dropped")
+
+    def __init__(self):
+        self.embeds = []  # (embed, file or None)
+        self.full = asyncio.Event()
+        self.task = None
+        self.dropped = 0
+
+
+class LogSink:
+    """Sends log embeds in the background, several per message.
+
+    post() only queues, so callers never wait on Discord. Each log channel
+    has one sender task that waits until a message's worth of embeds is
+    queued or LOG_FLUSH_INTERVAL passes, then sends them together, so a burst
+    of actions costs a few requests instead of one each.
+    """
+
+    def __init__(self, interval=LOG_FLUSH_INTERVAL, max_pending=LOG_MAX_PENDING):
+        self.interval = interval
+        self.max_pending = max_pending
+        self.queues = {}  # channel_id -> _ChannelQueue
+
+    def post(self, channel, embed, file=None):
+        """Queue an embed, optionally with a discord.File sent in the same message."""
+        queue = self.queues.get(channel.id)
+        if queue is None:
+            queue = self.queues[channel.id] = _ChannelQueue()
+        if len(queue.embeds) >= self.max_pending:
+            queue.dropped += 1
+            return
+        queue.embeds.append((embed, file))
+        if len(queue.embeds) >= EMBEDS_PER_MESSAGE:
+            queue.full.set()
+        if queue.task is None:
+            queue.task = asyncio.create_task(self._send_loop(channel, queue))
+
+    async def _send_loop(self, channel, queue):
+        try:
+            while queue.embeds:
+                if len(queue.embeds) < EMBEDS_PER_MESSAGE:
+                    queue.full.clear()
+                    try:
+                        await asyncio.wait_for(queue.full.wait(), self.interval)
+                    except asyncio.TimeoutError:
+                        pass
+                batch = self._take(queue)
+                files = [file for _, file in batch if file is not None]
+                try:
+                    await channel.send(embeds=[embed for embed, _ in batch], files=files)
+                except discord.HTTPException as e:
+                    print(f"Log Send Error: {e}")
+                if queue.dropped:
+                    print(f"Log Queue Full: dropped {queue.dropped} log entries for channel {channel.id}")
+                    queue.dropped = 0
+        finally:
+            queue.task = None
+            if not queue.embeds:
+                self.queues.pop(channel.id, None)
+
+    def _take(self, queue):
+        # As many queued embeds (and their files) as fit in one message
+        count, chars = 0, 0
+        for embed, _ in queue.embeds[:EMBEDS_PER_MESSAGE]:
+            chars += len(embed)
+            if count and chars > EMBED_CHARS_PER_MESSAGE:
+                break
+            count += 1
+        batch = queue.embeds[:count]
+        del queue.embeds[:count]
+        return batch
+
+
+log_sink = LogSink()
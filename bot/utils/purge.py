@@ -0,0 +1,196 @@
+import os
+import re
+import time
+import asyncio
+from datetime import timedelta
+import discord
+from dotenv import load_dotenv
+
+try:
+    from re import _parser as sre_parse  # Python 3.11+
+except ImportError:
+    import sre_parse
+
+load_dotenv()
+PURGE_MAX_MESSAGES = int(os.getenv("PURGE_MAX_MESSAGES", "10000"))  # Most messages one purge deletes
+PURGE_MAX_SCAN = int(os.getenv("PURGE_MAX_SCAN", "50000"))  # Most history one purge reads looking for matches
+PURGE_OLD_DELETE_DELAY = float(os.getenv("PURGE_OLD_DELETE_DELAY", "1.0"))  # Seconds between single deletes
+PURGE_PROGRESS_INTERVAL = 2.0
+BULK_DELETE_SIZE = 100  # Discord's bulk delete takes 2-100 messages...
+BULK_DELETE_MAX_AGE = timedelta(days=14) - timedelta(minutes=5)  # ...younger than 14 days (with some slack)
+
+LINK_RE = re.compile(r"https?://|discord\.gg/", re.IGNORECASE)
+
+REPEATS = {sre_parse.MAX_REPEAT, sre_parse.MIN_REPEAT} | ({sre_parse.POSSESSIVE_REPEAT} if hasattr(sre_parse, "POSSESSIVE_REPEAT") else set())
+GROUPS = {sre_parse.SUBPATTERN, getattr(sre_parse, "ATOMIC_GROUP", sre_parse.SUBPATTERN)}
+MESSAGE_LENGTH = 4000  # Longest message content; stands in for the bound of *, + and {n,}
+REGEX_BUDGET = 10000  # Most ways a pattern may try to match at one position
+
+
+TOO_COMPLEX = "it could take too long to match; use fewer repeats, optional parts or alternatives"
+
+
+def _regex_cost(items):
+    """Upper bound on the ways `items` can match at one position.
+
+    A sequence multiplies the choices of its parts, alternatives add up, and
+    a repeat of a fixed single choice has (max - min + 1) lengths to try,
+    while a repeat of something with several choices has choices ** max.
+    Raises re.error as soon as the bound passes REGEX_BUDGET.
+    """
+    cost = 1
+    for op, av in items:
+        if op in (sre_parse.GROUPREF, sre_parse.GROUPREF_EXISTS):
+            raise re.error("backreferences are not allowed")
+        if op in REPEATS:
+            low, high, sub = av
+            high = min(high, MESSAGE_LENGTH)
+            inner = _regex_cost(sub)
+            if inner == 1:
+                part = max(high - low + 1, 1)
+            elif high * inner.bit_length() > REGEX_BUDGET.bit_length():
+                raise re.error(TOO_COMPLEX)
+            else:
+                part = inner ** high
+        elif op is sre_parse.BRANCH:
+            part = sum(_regex_cost(branch) for branch in av[1])
+        elif op in GROUPS:
+            part = _regex_cost(av[-1])
+        elif op in (sre_parse.ASSERT, sre_parse.ASSERT_NOT):
+            part = _regex_cost(av[1])
+        else:
+            continue
+        cost *= part
+        if cost > REGEX_BUDGET:
+            raise re.error(TOO_COMPLEX)
+    return cost
+
+
+def check_regex(pattern):
+    """Reject patterns that can backtrack for seconds on one message. Raises re.error.
+
+    Python's re holds the GIL while matching, so a slow pattern would stall
+    the whole bot and cannot be timed out from another thread. Every
+    repeat, optional part and alternative multiplies the ways a match can
+    be attempted, so their combined count is capped at REGEX_BUDGET; a
+    single unbounded repeat like .* or \\S+ fits, chains of them do not.
+    """
+    _regex_cost(sre_parse.parse(pattern))
+
+
+def build_filter(user=None, bots=False, regex=None, links=False, attachments=False, skip_ids=()):
+    """One predicate for all the requested filters; regex is checked and compiled once."""
+    if regex:
+        check_regex(regex)
+    pattern = re.compile(regex, re.IGNORECASE) if regex else None
+    skip_ids = set(skip_ids)
+
+    def check(message):
+        if message.id in skip_ids:
+            return False
+        if user is not None and message.author.id != user.id:
+            return False
+        if bots and not message.author.bot:
+            return False
+        if links and not LINK_RE.search(message.content):
+            return False
+        if attachments and not message.attachments:
+            return False
+        if pattern is not None and not pattern.search(message.content):
+            return False
+        return True
+
+    return check
+
+
+class PurgePlan:
+    """Deletes matching messages while the history is still being read.
+
+    Messages young enough for bulk delete go out 100 per request as soon as
+    a batch fills. Older ones can only be deleted one by one, so they are
+    handed to a separate throttled lane and do not hold up the scan.
+    """
+
+    def __init__(self, channel):
+        self.channel = channel
+        self.cutoff = discord.utils.utcnow() - BULK_DELETE_MAX_AGE
+        self.batch = []
+        self.old = asyncio.Queue()
+        self.old_lane = None
+        self.deleted = []  # IDs
+        self.failed = 0
+
+    async def add(self, message):
+        if message.created_at > self.cutoff:
+            self.batch.append(message)
+            if len(self.batch) >= BULK_DELETE_SIZE:
+                await self._delete_batch()
+        else:
+            if self.old_lane is None:
+                self.old_lane = asyncio.create_task(self._delete_old())
+            self.old.put_nowait(message)
+
+    async def finish(self):
+        if self.batch:
+            await self._delete_batch()
+        if self.old_lane is not None:
+            self.old.put_nowait(None)
+            await self.old_lane
+
+    async def _delete_batch(self):
+        batch, self.batch = self.batch, []
+        try:
+            if len(batch) == 1:
+                await batch[0].delete()
+            else:
+                await self.channel.delete_messages(batch)
+            self.deleted += [m.id for m in batch]
+        except discord.NotFound:
+            # Someone else deleted part of the batch; fall back to single deletes
+            for message in batch:
+                await self._delete_one(message)
+        except discord.HTTPException as e:
+            print(f"Purge Bulk Delete Error: {e}")
+            self.failed += len(batch)
+
+    async def _delete_old(self):
+        while (message := await self.old.get()) is not None:
+            await self._delete_one(message)
+            await asyncio.sleep(PURGE_OLD_DELETE_DELAY)
+
+    async def _delete_one(self, message):
+        try:
+            await message.delete()
+            self.deleted.append(message.id)
+        except discord.NotFound:
+            pass
+        except discord.HTTPException as e:
+            print(f"Purge Delete Error: {e}")
+            self.failed += 1
+
+
+async def purge_channel(channel, amount, check, before=None, after=None, on_progress=None):
+    """Delete up to `amount` messages matching `check`, newest first.
+
+    Reads history in one streaming pass (at most PURGE_MAX_SCAN messages)
+    and returns (deleted IDs, failed count, messages scanned).
+    on_progress(scanned, deleted) is awaited every PURGE_PROGRESS_INTERVAL.
+    """
+    plan = PurgePlan(channel)
+    scanned = matched = 0
+    next_report = time.monotonic() + PURGE_PROGRESS_INTERVAL
+    async for message in channel.history(limit=PURGE_MAX_SCAN, before=before, after=after, oldest_first=False):
+        scanned += 1
+        if check(message):
+            matched += 1
+            await plan.add(message)
+            if matched >= amount:
+                break
+        if on_progress and time.monotonic() >= next_report:
+            next_report = time.monotonic() + PURGE_PROGRESS_INTERVAL
+            try:
+                await on_progress(scanned, len(plan.deleted))
+            except Exception as e:
+                print(f"Purge Progress Error: {e}")
+    await plan.finish()
+    return plan.deleted, plan.failed, scanned
@@ -0,0 +1,95 @@
+import os
+import time
+from collections import OrderedDict
+from dotenv import load_dotenv
+
+
+def parse_rate(value):
+    # "5/60" -> 5 requests per 60 seconds
+    count, per = value.split("/")
+    return int(count), float(per)
+
+
+load_dotenv()
+AI_RATE_USER = parse_rate(os.getenv("AI_RATE_USER", "5/60"))
+AI_RATE_CHANNEL = parse_rate(os.getenv("AI_RATE_CHANNEL", "20/60"))
+AI_RATE_GUILD = parse_rate(os.getenv("AI_RATE_GUILD", "60/60"))
+
+
+class TokenBucketLimiter:
+    """In-memory token buckets, one per key.
+
+    Buckets are kept in least-recently-used order. A bucket idle long enough
+    to be full again carries no state, so it is dropped from the front of the
+    order as other keys are touched; each check is O(1) amortized.
+    """
+
+    def __init__(self, capacity, per):
+        self.capacity = capacity
+        self.per = per
+        self.rate = capacity / per  # Tokens regained per second
+        self.buckets = OrderedDict()  # key -> [tokens, updated_at]
+
+    def _bucket(self, key, now):
+        bucket = self.buckets.get(key)
+        if bucket is None:
+            bucket = self.buckets[key] = [float(self.capacity), now]
+        else:
+            bucket[0] = min(self.capacity, bucket[0] + (now - bucket[1]) * self.rate)
+            bucket[1] = now
+            self.buckets.move_to_end(key)
+        self._evict_idle(now)
+        return bucket
+
+    def _evict_idle(self, now):
+        while self.buckets:
+            key, (_, updated_at) = next(iter(self.buckets.items()))
+            if now - updated_at < self.per:
+                break
+            del self.buckets[key]
+
+    def retry_after(self, key, cost=1, now=None):
+        """Seconds until `cost` tokens are available; 0 when allowed now."""
+        now = time.monotonic() if now is None else now
+        tokens = self._bucket(key, now)[0]
+        return 0.0 if tokens >= cost else (cost - tokens) / self.rate
+
+    def consume(self, key, cost=1, now=None):
+        now = time.monotonic() if now is None else now
+        self._bucket(key, now)[0] -= cost
+
+
+class AIRateLimiter:
+    """Per-user, per-channel and per-guild limits for AI requests."""
+
+    def __init__(self, user=AI_RATE_USER, channel=AI_RATE_CHANNEL, guild=AI_RATE_GUILD):
+        self.limiters = (TokenBucketLimiter(*user), TokenBucketLimiter(*channel), TokenBucketLimiter(*guild))
+        self.notified = OrderedDict()  # user_id -> time their cooldown notice stops covering them
+
+    def should_notify(self, user_id, wait):
+        """Whether a limited user should be told to wait: once per cooldown, so a
+        flood of limited messages does not become a flood of replies."""
+        now = time.monotonic()
+        if self.notified.get(user_id, 0) > now:
+            return False
+        self.notified.pop(user_id, None)
+        self.notified[user_id] = now + wait
+        # Drop expired notices from the front (roughly oldest first) so the dict stays small
+        while self.notified:
+            key, until = next(iter(self.notified.items()))
+            if until > now:
+                break
+            del self.notified[key]
+        return True
+
+    def hit(self, user_id, channel_id, guild_id):
+        """Take one request from every bucket, or none if any is empty.
+        Returns 0 when allowed, else the seconds to wait."""
+        now = time.monotonic()
+        keys = (user_id, channel_id, guild_id)
+        wait = max(limiter.retry_after(key, now=now) for limiter, key in zip(self.limiters, keys))
+        if wait:
+            return wait
+        for limiter, key in zip(self.limiters, keys):
+            limiter.consume(key, now=now)
+        return 0.0
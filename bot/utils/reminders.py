@@ -0,0 +1,238 @@
+import time
+import heapq
+import asyncio
+import threading
+import discord
+from bot.utils.db import DATABASE_PATH, connect
+
+MAX_REMINDERS_PER_USER = 25
+DELIVERY_CONCURRENCY = 5  # Reminders sent at once when many come due together
+RETRY_DELAY = 60  # Seconds before a failed delivery is tried again; doubles per attempt up to an hour
+
+_DELETED = object()  # Marks a pending delete in the write-behind buffer
+
+
+class Reminder:
+    __slots__ = ("id", "user_id", "channel_id", "guild_id", "due_at", "text", "send_at", "attempts")
+
+    def __init__(self, id, user_id, channel_id, guild_id, due_at, text):
+        self.id = id
+        self.user_id = user_id
+        self.channel_id = channel_id
+        self.guild_id = guild_id
+        self.due_at = due_at
+        self.text = text
+        self.send_at = due_at  # Next delivery attempt; later than due_at after a failed one
+        self.attempts = 0
+
+
+class ReminderScheduler:
+    """Durable reminders driven by one task and a min-heap of due times.
+
+    All pending reminders are loaded in one query at startup and the task
+    sleeps until the earliest one is due, so a pending reminder costs one
+    small object and a heap entry rather than a sleeping coroutine.
+    Reminders that came due while the bot was offline are sent on start.
+    A reminder is deleted only once it is sent, or when neither its channel
+    nor the user's DMs can ever take it; other failures are retried later.
+    Inserts and deletes are written to SQLite in batches (write-behind).
+    """
+
+    def __init__(self, path=DATABASE_PATH, flush_delay=1.0):
+        self.path = path
+        self.flush_delay = flush_delay
+        self.conn = None
+        self.lock = threading.Lock()
+        self.reminders = None  # id -> Reminder
+        self.by_user = {}  # user_id -> set of reminder ids
+        self.heap = []  # (send_at, id); cancelled ids are skipped when popped
+        self.sending = set()  # Reminder ids being delivered right now
+        self.next_id = 1
+        self.dirty = {}  # id -> Reminder or _DELETED
+        self.flush_task = None
+        self.bot = None
+        self.task = None
+        self.wakeup = asyncio.Event()
+        self.delivery = asyncio.Semaphore(DELIVERY_CONCURRENCY)
+
+    def load(self):
+        if self.reminders is not None:
+            return
+        self.conn = connect(self.path)
+        with self.lock, self.conn:
+            self.conn.execute(
+                "CREATE TABLE IF NOT EXISTS reminders ("
+                "id INTEGER PRIMARY KEY, user_id INTEGER NOT NULL, channel_id INTEGER NOT NULL, "
+                "guild_id INTEGER, due_at REAL NOT NULL, text TEXT NOT NULL)"
+            )
+            rows = self.conn.execute(
+                "SELECT id, user_id, channel_id, guild_id, due_at, text FROM reminders"
+            ).fetchall()
+            (last_id,) = self.conn.execute("SELECT MAX(id) FROM reminders").fetchone()
+        self.reminders = {}
+        for row in rows:
+            self._track(Reminder(*row))
+        self._rebuild_heap()
+        self.next_id = (last_id or 0) + 1
+
+    def start(self, bot):
+        """Start the scheduler task; safe to call again on reconnect."""
+        self.bot = bot
+        if self.reminders is None:
+            self.load()
+        if self.task is None or self.task.done():
+            self.task = asyncio.create_task(self._run())
+
+    def add(self, user_id, channel_id, guild_id, seconds, text):
+        if self.reminders is None:
+            self.load()
+        reminder = Reminder(self.next_id, user_id, channel_id, guild_id, time.time() + seconds, text)
+        self.next_id += 1
+        self._track(reminder)
+        self._schedule(reminder)
+        self._mark(reminder.id, reminder)
+        return reminder
+
+    def cancel(self, user_id, reminder_id):
+        """Cancel one of the user's reminders. Returns False if they have no such reminder."""
+        if reminder_id not in self.by_user.get(user_id, ()):
+            return False
+        self._untrack(reminder_id)
+        self._mark(reminder_id, _DELETED)
+        # Cancelled entries stay in the heap until popped; rebuild if they pile up
+        if len(self.heap) > 2 * len(self.reminders) + 64:
+            self._rebuild_heap()
+        return True
+
+    def pending_for(self, user_id):
+        """The user's pending reminders, soonest first."""
+        if self.reminders is None:
+            self.load()
+        return sorted((self.reminders[i] for i in self.by_user.get(user_id, ())), key=lambda r: r.due_at)
+
+    def count_for(self, user_id):
+        return len(self.by_user.get(user_id, ()))
+
+    def _schedule(self, reminder):
+        heapq.heappush(self.heap, (reminder.send_at, reminder.id))
+        if self.heap[0][1] == reminder.id:
+            self.wakeup.set()  # New earliest reminder; the task is sleeping too long
+
+    def _rebuild_heap(self):
+        self.heap = [(r.send_at, r.id) for r in self.reminders.values() if r.id not in self.sending]
+        heapq.heapify(self.heap)
+
+    def _track(self, reminder):
+        self.reminders[reminder.id] = reminder
+        self.by_user.setdefault(reminder.user_id, set()).add(reminder.id)
+
+    def _untrack(self, reminder_id):
+        reminder = self.reminders.pop(reminder_id)
+        ids = self.by_user[reminder.user_id]
+        ids.discard(reminder_id)
+        if not ids:
+            del self.by_user[reminder.user_id]
+        return reminder
+
+    async def _run(self):
+        while True:
+            # Drop cancelled entries from the top of the heap
+            while self.heap and self.heap[0][1] not in self.reminders:
+                heapq.heappop(self.heap)
+            if not self.heap:
+                delay = None
+            else:
+                delay = self.heap[0][0] - time.time()
+                if delay <= 0:
+                    _, reminder_id = heapq.heappop(self.heap)
+                    # Stays stored until delivered, so a failed send or a restart does not lose it
+                    reminder = self.reminders[reminder_id]
+                    self.sending.add(reminder_id)
+                    await self.delivery.acquire()
+                    asyncio.create_task(self._deliver(reminder))
+                    continue
+
+            self.wakeup.clear()
+            try:
+                await asyncio.wait_for(self.wakeup.wait(), delay)
+            except asyncio.TimeoutError:
+                pass
+
+    async def _deliver(self, reminder):
+        done = True
+        try:
+            await self._send(reminder)
+        except (discord.NotFound, discord.Forbidden) as e:
+            # Neither the channel nor the user's DMs will take it; retrying cannot help
+            print(f"Reminder Undeliverable: {e}")
+        except Exception as e:
+            print(f"Reminder Delivery Error: {e}")
+            done = False
+        finally:
+            self.sending.discard(reminder.id)
+            self.delivery.release()
+
+        if reminder.id not in self.reminders:
+            return  # Cancelled while being sent
+        if done:
+            self._untrack(reminder.id)
+            self._mark(reminder.id, _DELETED)
+        else:
+            reminder.attempts += 1
+            reminder.send_at = time.time() + min(RETRY_DELAY * 2 ** (reminder.attempts - 1), 3600)
+            self._schedule(reminder)
+
+    async def _send(self, reminder):
+        late = time.time() - reminder.due_at
+        note = ""
+        if late > 60:
+            late_text = f"{late / 3600:.1f}h" if late >= 3600 else f"{late // 60:.0f}m"
+            note = f" (was due <t:{int(reminder.due_at)}:R>, {late_text} late)"
+        content = f"<@{reminder.user_id}> ⏰ **Reminder:** {reminder.text}{note}"
+        channel = self.bot.get_channel(reminder.channel_id)
+        try:
+            if channel is None:
+                channel = await self.bot.fetch_channel(reminder.channel_id)
+            await channel.send(content)
+        except (discord.NotFound, discord.Forbidden):
+            # Channel gone or closed to us; try a direct message instead
+            user = self.bot.get_user(reminder.user_id) or await self.bot.fetch_user(reminder.user_id)
+            await user.send(content)
+
+    def _mark(self, reminder_id, value):
+        self.dirty[reminder_id] = value
+        if self.flush_task is None or self.flush_task.done():
+            self.flush_task = asyncio.create_task(self._flush_later())
+
+    async def _flush_later(self):
+        await asyncio.sleep(self.flush_delay)
+        await self.flush()
+
+    async def flush(self):
+        """Write all pending inserts and deletes in one transaction."""
+        if not self.dirty:
+            return
+        batch, self.dirty = self.dirty, {}
+        try:
+            await asyncio.to_thread(self._write, batch)
+        except Exception as e:
+            print(f"Reminder Write Error: {e}")
+            for reminder_id, value in batch.items():
+                self.dirty.setdefault(reminder_id, value)
+
+    def _write(self, batch):
+        inserts = [
+            (r.id, r.user_id, r.channel_id, r.guild_id, r.due_at, r.text)
+            for r in batch.values() if r is not _DELETED
+        ]
+        deletes = [(reminder_id,) for reminder_id, r in batch.items() if r is _DELETED]
+        with self.lock, self.conn:
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO reminders (id, user_id, channel_id, guild_id, due_at, text) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                inserts,
+            )
+            self.conn.executemany("DELETE FROM reminders WHERE id = ?", deletes)
+
+
+reminders = ReminderScheduler()
@@ -0,0 +1,53 @@
+import asyncio
+from collections import OrderedDict
+import discord
+
+REPLY_CACHE_SIZE = 512  # Recently fetched referenced messages kept in memory
+
+fetched = OrderedDict()  # message_id -> discord.Message, least recently used first
+pending = {}  # message_id -> fetch task shared by concurrent callers
+
+
+async def _fetch(channel, message_id):
+    replied = await channel.fetch_message(message_id)
+    fetched[message_id] = replied
+    if len(fetched) > REPLY_CACHE_SIZE:
+        fetched.popitem(last=False)
+    return replied
+
+
+async def resolve_reference(message):
+    """Return the message that `message` replies to, or None.
+
+    Checks, in order: the payload discord already resolved, discord.py's
+    message cache, our LRU of fetched messages, and only then the REST API.
+    Concurrent lookups of the same message share one fetch.
+    """
+    ref = message.reference
+    if ref is None or ref.message_id is None:
+        return None
+    if isinstance(ref.resolved, discord.Message):
+        return ref.resolved
+    if isinstance(ref.resolved, discord.DeletedReferencedMessage):
+        return None
+    if ref.cached_message is not None:
+        return ref.cached_message
+
+    message_id = ref.message_id
+    if message_id in fetched:
+        fetched.move_to_end(message_id)
+        return fetched[message_id]
+
+    task = pending.get(message_id)
+    if task is None:
+        channel = message.channel
+        if ref.channel_id != channel.id and message.guild:
+            channel = message.guild.get_channel_or_thread(ref.channel_id) or channel
+        task = asyncio.create_task(_fetch(channel, message_id))
+        pending[message_id] = task
+        task.add_done_callback(lambda _: pending.pop(message_id, None))
+    try:
+        # Shield so one handler giving up does not cancel the fetch for the others
+        return await asyncio.shield(task)
+    except discord.HTTPException:
+        return None
@@ -0,0 +1,35 @@
+from bot.utils.guild_config import guild_config
+
+ROUTE_AI = "ai"  # Messages answered by the AI
+
+
+class RoutingTable:
+    """Channel id -> route, so on_message picks a handler with one dict lookup.
+
+    Built once from guild_config and patched in place when a guild's AI
+    channel changes, so the per-message cost does not grow with guild count.
+    """
+
+    def __init__(self, config=guild_config):
+        self.config = config
+        self.routes = None  # channel_id -> route
+        config.subscribe("ai_channel", self._ai_channel_changed)
+
+    def build(self):
+        self.routes = {channel_id: ROUTE_AI for _, channel_id in self.config.items("ai_channel")}
+
+    def get(self, channel_id):
+        if self.routes is None:
+            self.build()
+        return self.routes.get(channel_id)
+
+    def _ai_channel_changed(self, guild_id, old, new):
+        if self.routes is None:
+            return  # Not built yet; the first build reads the new value
+        if old is not None:
+            self.routes.pop(old, None)
+        if new is not None:
+            self.routes[new] = ROUTE_AI
+
+
+routes = RoutingTable()
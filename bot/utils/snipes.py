@@ -0,0 +1,87 @@
+import os
+import time
+from collections import OrderedDict, deque
+from dotenv import load_dotenv
+
+load_dotenv()
+SNIPES_PER_CHANNEL = int(os.getenv("SNIPES_PER_CHANNEL", "10"))
+SNIPE_TTL = float(os.getenv("SNIPE_TTL", "3600"))  # Seconds a deleted message can be sniped
+SNIPE_MAX_TOTAL = int(os.getenv("SNIPE_MAX_TOTAL", "5000"))  # Records kept across all channels
+SNIPE_MAX_CONTENT = 2000
+
+
+class DeletedMessage:
+    """What snipe shows of a deleted message; holds no discord objects."""
+
+    __slots__ = ("channel_id", "channel_name", "author_name", "author_avatar", "content", "attachments", "deleted_at")
+
+    def __init__(self, message, deleted_at):
+        self.channel_id = message.channel.id
+        self.channel_name = getattr(message.channel, "name", None)
+        self.author_name = message.author.display_name
+        self.author_avatar = message.author.display_avatar.url
+        self.content = message.content[:SNIPE_MAX_CONTENT]
+        self.attachments = tuple(a.filename for a in message.attachments)
+        self.deleted_at = deleted_at
+
+
+class SnipeCache:
+    """Recently deleted messages in a bounded ring buffer per channel.
+
+    Channels are kept in least-recently-deleted order; when the global cap
+    is reached the oldest record of the stalest channel is dropped, so every
+    add is O(1) and memory stays bounded however many channels are active.
+    """
+
+    def __init__(self, per_channel=SNIPES_PER_CHANNEL, ttl=SNIPE_TTL, max_total=SNIPE_MAX_TOTAL):
+        self.per_channel = per_channel
+        self.ttl = ttl
+        self.max_total = max_total
+        self.channels = OrderedDict()  # channel_id -> deque of DeletedMessage, oldest first
+        self.total = 0
+
+    def add(self, message, now=None):
+        if not message.content and not message.attachments:
+            return
+        now = time.time() if now is None else now
+        buffer = self.channels.get(message.channel.id)
+        if buffer is None:
+            buffer = self.channels[message.channel.id] = deque(maxlen=self.per_channel)
+        else:
+            self.channels.move_to_end(message.channel.id)
+        if len(buffer) < self.per_channel:
+            self.total += 1  # A full ring drops its oldest record itself
+        buffer.append(DeletedMessage(message, now))
+        while self.total > self.max_total:
+            self._evict_oldest()
+
+    def add_many(self, messages):
+        now = time.time()
+        for message in sorted(messages, key=lambda m: m.id):
+            self.add(message, now)
+
+    def get(self, channel_id, index=1):
+        """The index-th most recently deleted message in the channel (1 = latest), and how many there are."""
+        buffer = self.channels.get(channel_id)
+        if buffer is None:
+            return None, 0
+        cutoff = time.time() - self.ttl
+        while buffer and buffer[0].deleted_at < cutoff:
+            buffer.popleft()
+            self.total -= 1
+        if not buffer:
+            del self.channels[channel_id]
+            return None, 0
+        if not 1 <= index <= len(buffer):
+            return None, len(buffer)
+        return buffer[-index], len(buffer)
+
+    def _evict_oldest(self):
+        channel_id, buffer = next(iter(self.channels.items()))
+        buffer.popleft()
+        self.total -= 1
+        if not buffer:
+            del self.channels[channel_id]
+
+
+snipes = SnipeCache()
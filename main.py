@@ -15,6 +15,10 @@ from bot.commands.utility import setup_utility
 from bot.commands.ai import setup_ai
 from bot.commands.help import setup_help  # Ensure this exists and is correct
 from bot.utils.status import update_status
+from bot.utils.guild_config import guild_config
+from bot.utils.routing import routes
+from bot.utils.cases import case_store
+from bot.utils.reminders import reminders
 
 # Load environment variables from .env file
 load_dotenv()
@@ -44,9 +48,22 @@ async def setup_bot():
         await bot.tree.sync()  # Sync slash commands
         print("Slash commands synced")
         bot.loop.create_task(update_status(bot))  # Start updating bot status
+        reminders.start(bot)  # Sends reminders that came due while offline, then waits for the next
+
+    # Load per-guild settings and the message routing table before any events arrive
+    guild_config.load()
+    case_store.load()
+    reminders.load()
+    routes.build()
 
     # Start the bot using the token from the .env file
-    await bot.start(TOKEN)
+    try:
+        await bot.start(TOKEN)
+    finally:
+        # Write out settings, cases and reminders changed since the last write-behind flush
+        await guild_config.flush()
+        await case_store.flush()
+        await reminders.flush()
 
 # This condition ensures the script runs when directly executed
 if __name__ == "__main__":